@@ -0,0 +1,74 @@
+# convert_maps.py - Convert json maps into the binary level files & benchmark loading
+#
+# @author      : Chiho Kim (chiho80@gmail.com)
+# @file        : convert_maps.py
+# @created     : Sunday Oct 18, 2026 14:05 PT
+#
+# Copyright (c) 2026 Chiho Kim. All rights reserved.
+
+import os
+import sys
+import time
+import tracemalloc
+from scripts.constants import LEVELS
+from scripts.levelpack import read_map, pack_map, packed_path
+
+# Usage:
+#   python convert_maps.py               - Pack all the levels in data/maps
+#   python convert_maps.py 8 9           - Pack level 8 and 9 only
+#   python convert_maps.py --benchmark   - Report load time and peak memory of
+#                                          json and binary level files for each level
+
+# Number of loads to average the load time over
+BENCHMARK_REPEAT = 20
+
+
+def measure(path, use_packed):
+    """Return (average load time in ms, peak memory in KB) of reading the map"""
+    start = time.perf_counter()
+    for _ in range(BENCHMARK_REPEAT):
+        read_map(path, use_packed=use_packed)
+    load_time = (time.perf_counter() - start) / BENCHMARK_REPEAT * 1000
+
+    tracemalloc.start()
+    read_map(path, use_packed=use_packed)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return load_time, peak / 1024
+
+
+def benchmark(levels):
+    print(
+        f"{'LEVEL':>5} {'JSON KB':>8} {'BLVL KB':>8} {'JSON ms':>8} {'BLVL ms':>8}"
+        f" {'JSON peak KB':>13} {'BLVL peak KB':>13}"
+    )
+    for level in levels:
+        path = LEVELS[level]["map"]
+        if not os.path.exists(packed_path(path)):
+            pack_map(path)
+        json_time, json_peak = measure(path, use_packed=False)
+        packed_time, packed_peak = measure(path, use_packed=True)
+        print(
+            f"{level:>5} {os.path.getsize(path) / 1024:>8.1f}"
+            f" {os.path.getsize(packed_path(path)) / 1024:>8.1f}"
+            f" {json_time:>8.2f} {packed_time:>8.2f}"
+            f" {json_peak:>13.1f} {packed_peak:>13.1f}"
+        )
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    # Level -1 is the dev map, which may not exist
+    levels = args if args else [level for level in LEVELS if level != "-1"]
+
+    if "--benchmark" in sys.argv:
+        benchmark(levels)
+        return
+
+    for level in levels:
+        path = LEVELS[level]["map"]
+        pack_map(path)
+        print(f"{path} -> {packed_path(path)}")
+
+
+main()
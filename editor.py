@@ -105,10 +105,10 @@ class Editor:
             self.scroll[1] += (self.movement[3] - self.movement[2]) * 4
             render_scroll = (int(self.scroll[0]), int(self.scroll[1]))
 
+            self.tilemap.update(activate_movingground=self.activate_movingground)
             self.tilemap.render(
                 self.display,
                 offset=render_scroll,
-                activate_movingground=self.activate_movingground,
                 show_movingground_id_pair=True,
             )
 
@@ -130,7 +130,7 @@ class Editor:
                 int((mpos[0] + self.scroll[0]) // self.tilemap.tile_size),
                 int((mpos[1] + self.scroll[1]) // self.tilemap.tile_size),
             )
-            tile_loc = f"{tile_pos[0]};{tile_pos[1]}"
+            tile_loc = tile_pos
 
             # Preview where the tile will be placed
             if self.ongrid:
@@ -146,26 +146,22 @@ class Editor:
 
             # Place a tile
             if self.clicking and self.ongrid:
-                self.tilemap.tilemap[tile_loc] = {
-                    "type": self.tile_list[self.tile_group],
-                    "variant": self.tile_variant,
-                    "pos": tile_pos,
-                }
+                self.tilemap.add_tile(
+                    tile_loc,
+                    {
+                        "type": self.tile_list[self.tile_group],
+                        "variant": self.tile_variant,
+                        "pos": tile_pos,
+                    },
+                )
 
             # Delete a tile
             if self.right_clicking:
-                if tile_loc in self.tilemap.tilemap:
-                    del self.tilemap.tilemap[tile_loc]
-                for tile in self.tilemap.offgrid_tiles.copy():
-                    tile_img = self.assets[tile["type"]][tile["variant"]]
-                    tile_r = pygame.Rect(
-                        tile["pos"][0] - self.scroll[0],
-                        tile["pos"][1] - self.scroll[1],
-                        tile_img.get_width(),
-                        tile_img.get_height(),
-                    )
-                    if tile_r.collidepoint(mpos):
-                        self.tilemap.offgrid_tiles.remove(tile)
+                self.tilemap.remove_tile(tile_loc)
+                for tile in self.tilemap.offgrid_tiles_at(
+                    (mpos[0] + self.scroll[0], mpos[1] + self.scroll[1])
+                ):
+                    self.tilemap.remove_offgrid(tile)
 
             # Preview current tile selected at top left
             self.display.blit(current_tile_text, (5, 5))
@@ -191,7 +187,7 @@ class Editor:
                                     mpos[1] + self.scroll[1],
                                 ),
                             }
-                            self.tilemap.offgrid_tiles.append(tiledata)
+                            self.tilemap.add_offgrid(tiledata)
                     if event.button == 3:
                         self.right_clicking = True
                     if self.shift:
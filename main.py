@@ -21,8 +21,7 @@ from scripts.banners import (
     display_finale,
 )
 from scripts.game import Game
-from scripts.particle import Particle
-from scripts.spark import Spark
+from scripts.fireswing import Fireswing
 from scripts.control import check_keyboard_input
 
 # User can specify the level to start by providing an argument.
@@ -81,6 +80,10 @@ def main():
                         if event.key == pygame.K_n or event.key == pygame.K_q:
                             quit_game = True
                             selection_made = True
+                    if event.type == pygame.WINDOWEXPOSED:
+                        pygame.display.update()
+                # Nothing to draw while waiting. Don't spin the CPU polling the events.
+                game.clock.tick(FRAME_RATE)
             if not quit_game:
                 game.reset_game(FIRST_LEVEL)
                 game.sfx["levelclear"].play()
@@ -89,6 +92,11 @@ def main():
                 pygame.quit()
                 sys.exit()
 
+        # Start counting the collision checks and blits of this frame
+        game.collision.new_frame()
+        game.render_queue.new_frame()
+        layer = game.render_queue.layer
+
         # Cover screen with the default background color
         if game.season in COLORS:
             game.display.fill(COLORS[game.season])
@@ -165,7 +173,7 @@ def main():
                     rect.y - 13,
                 )
                 game.fireballs.append(
-                    Particle(
+                    game.pools["particle"].acquire(
                         game,
                         "fireball",
                         pos,
@@ -179,8 +187,8 @@ def main():
                 if abs(dis) < 500:
                     game.sfx["fireball"].play()
 
-        # Spawn particles - fireswing. Spawners are collected in game.py
-        # fireswing members (small fires) will be appended only one time.
+        # Spawn fireswings. Spawners are collected in game.py
+        # Fireswings will be appended only one time.
         if not len(game.fireswings):
             for rect in game.fireswing_spawners:
                 intial_theta = random.random() * 2
@@ -189,61 +197,63 @@ def main():
                     * 0.001
                     * (-1 if random.random() > 0.5 else 1)
                 )
-                # Length of fireswing
-                for l in range(FIRESWING_LENGTH):
-                    pos = (rect.centerx, rect.centery)
-                    game.fireswings.append(
-                        Particle(
-                            game,
-                            "fireswing",
-                            pos,
-                            angular_motion_velocity=velocity,
-                            angular_motion_center=pos,
-                            angular_motion_offset=l * FIRESWING_UNIT_LENGTH,
-                            angular_motion_initial_theta=intial_theta,
-                            frame=0,
-                            freefalling=False,
-                        )
+                game.fireswings.append(
+                    Fireswing(
+                        game,
+                        (rect.centerx, rect.centery),
+                        velocity,
+                        intial_theta,
+                        FIRESWING_LENGTH,
+                        FIRESWING_UNIT_LENGTH,
                     )
+                )
+                # The fires swing within this area
+                game.collision.add_area(
+                    "fireswing", game.fireswings[-1], game.fireswings[-1].area()
+                )
 
-        # Spawn particles - leaf. Spawners are collected in game.py
-        if VISUAL_EFFECT["leaf"]:
-            for rect in game.leaf_spawners:
-                # Make spawn rate (probability) depends on the size of the rect
-                # *1 = 100% spawning each frame
-                # *49999 = small chance of spawning each frame
-                if random.random() * 49999 < rect.width * rect.height:
-                    # Spawn position should be bound in the rect area
-                    pos = (
-                        rect.x + random.random() * rect.width,
-                        rect.y + random.random() * rect.height,
-                    )
-                    game.particles.append(
-                        Particle(
-                            game,
-                            "leaf",
-                            pos,
-                            velocity=[-0.1, 0.3],
-                            frame=random.randint(0, 3),
-                        )
-                    )
         # Render cloud, map, and entities (enemy, player)
         if game.is_game_started:
             # Render cloud.
             if VISUAL_EFFECT["cloud"]:
                 game.clouds.update()
-                game.clouds.render(game.display, offset=render_scroll)
+                game.clouds.render(layer("cloud"), offset=render_scroll)
+
+            # Move the moving tiles, then render map
+            game.tilemap.update()
+            game.tilemap.render(layer("tile"), offset=render_scroll)
 
-            # Render map
-            game.tilemap.render(game.display, offset=render_scroll)
+            # Spawn the enemies the camera is getting close to.
+            # Only the enemies near the camera are awake. The others sleep.
+            game.spawn_enemies()
+            awake_enemies = game.awake_enemies()
 
+            # Update enemies
+            if game.enemy_system:
+                # All the awake enemies at once
+                game.enemy_system.update(awake_enemies)
+            else:
+                for enemy in awake_enemies:
+                    enemy.update(game.tilemap, (0, 0))
+            game.collision.add_entities("enemy", awake_enemies)
+            # Enemies hitting the player. Masks are the ones rendered in the last frame.
+            for enemy in game.collision.mask_hits("enemy"):
+                enemy.hit_player()
+            # Enemies attacked (dash) by player
+            kills = []
+            if abs(game.player.dashing) >= 50:
+                kills = game.collision.rect_hits("enemy")
+                for enemy in kills:
+                    enemy.killed_by_player()
             # Render enemies
-            for enemy in game.enemies.copy():
-                kill = enemy.update(game.tilemap, (0, 0))
-                enemy.render(game.display, offset=render_scroll)
-                # If enemy is killed by player by dashing ... remove that enemy
-                if kill:
-                    game.enemies.remove(enemy)
+            for enemy in awake_enemies:
+                enemy.render(layer("entity"), offset=render_scroll)
+            # If enemy is killed by player by dashing ... remove that enemy
+            for enemy in kills:
+                game.enemies.discard(enemy)
+                if game.enemy_system:
+                    game.enemy_system.remove(enemy)
+            game.enemies.compact()
 
             # Player can move around only when it's not died.
             # When died, player image won't be rendered.
@@ -284,48 +294,58 @@ def main():
                         ]
                     game.player.blink += 1
                     if int(game.time_remain / 50) % 2 == 1:
-                        game.player.render(game.display, offset=render_scroll)
+                        game.player.render(layer("entity"), offset=render_scroll)
                     if game.player.blink > 20:
                         game.player.blink = 0
                         game.player.bounce_direction = 0
                 else:
-                    game.player.render(game.display, offset=render_scroll)
-
-        # Render projectiles  [[x, y], direction, timer]
-        for projectile in game.projectiles.copy():
-            projectile[0][0] += projectile[1]  # Add direction to x position
-            projectile[2] += 1  # Update timer
+                    game.player.render(layer("entity"), offset=render_scroll)
+
+        # Render projectiles
+        for projectile in game.projectiles:
+            projectile.pos[0] += projectile.direction
+            projectile.timer += 1
+        # Check all the projectiles hitting walls at once
+        hits = game.tilemap.solid_points(
+            [projectile.pos for projectile in game.projectiles]
+        )
+        # and the player
+        game.collision.add_points(
+            "projectile",
+            game.projectiles,
+            [projectile.pos for projectile in game.projectiles],
+        )
+        player_hits = set(game.collision.point_hits("projectile"))
+        for projectile, hit in zip(game.projectiles, hits):
             img = game.assets["projectile"]
-            game.display.blit(
+            layer("projectile").blit(
                 img,
                 (
-                    projectile[0][0] - img.get_width() / 2 - render_scroll[0],
-                    projectile[0][1] - img.get_height() / 2 - render_scroll[1],
+                    projectile.pos[0] - img.get_width() / 2 - render_scroll[0],
+                    projectile.pos[1] - img.get_height() / 2 - render_scroll[1],
                 ),
             )
             # Remove prjojectile when ...
-            if game.tilemap.solid_check(projectile[0]):
+            if hit:
                 # when projectile hits walls
-                game.projectiles.remove(projectile)
+                game.projectiles.discard(projectile)
                 # Spawn sparks
                 for _ in range(4 * VISUAL_EFFECT["spark"]):
-                    game.sparks.append(
-                        Spark(
-                            projectile[0],
-                            random.random()
-                            - 0.5
-                            + (math.pi if projectile[1] > 0 else 0),
-                            2 + random.random(),
-                            size=(1, 3),
-                        )
+                    game.sparks.add(
+                        projectile.pos,
+                        random.random()
+                        - 0.5
+                        + (math.pi if projectile.direction > 0 else 0),
+                        2 + random.random(),
+                        size=(1, 3),
                     )
-            elif projectile[2] > 300:
+            elif projectile.timer > 300:
                 # When projectile traveles too long
-                game.projectiles.remove(projectile)
+                game.projectiles.discard(projectile)
             elif abs(game.player.dashing) < 50:
                 # when projectile collides with player not in the 10th frame of dashing
-                if game.player.rect().collidepoint(projectile[0]):
-                    game.projectiles.remove(projectile)
+                if projectile in player_hits:
+                    game.projectiles.discard(projectile)
                     # Trigger blinking
                     game.player.blink += 1
                     # Mark player is died
@@ -342,7 +362,7 @@ def main():
                     # Player bounce direction.
                     # After bouncing effect is finished, main.py will update
                     # the bounce_direction with zero (0).
-                    if game.player.pos[0] > (projectile[0][0] - projectile[1]):
+                    if game.player.pos[0] > (projectile.pos[0] - projectile.direction):
                         game.player.bounce_direction = 1
                     else:
                         game.player.bounce_direction = -1
@@ -354,39 +374,43 @@ def main():
                     # Spawn sparks
                     for _ in range(6 * VISUAL_EFFECT["spark"]):
                         angle = random.random() * math.pi * 2
-                        game.sparks.append(
-                            Spark(
-                                game.player.rect().center,
-                                angle,
-                                1 + random.random(),
-                                size=(1, 8),
-                            )
+                        game.sparks.add(
+                            game.player.rect().center,
+                            angle,
+                            1 + random.random(),
+                            size=(1, 8),
                         )
+        game.projectiles.compact(game.pools["projectile"].release)
 
-        # Render and remove spark of projectiles
-        # Spark is 'object', and the spawn, update and remove will be self managed
-        for spark in game.sparks.copy():
-            kill = spark.update()
-            spark.render(game.display, offset=render_scroll)
-            if kill:
-                game.sparks.remove(spark)
+        # Render and remove sparks, all at once (see SparkSystem)
+        game.sparks.update()
+        game.sparks.render(layer("effect"), offset=render_scroll)
+
+        # Spawn, render and remove leaves. Spawners are collected in game.py
+        if VISUAL_EFFECT["leaf"]:
+            game.leaves.update()
+            game.leaves.render(layer("effect"), offset=render_scroll)
 
         # Render particles other than fireballs
-        for particle in game.particles.copy():
+        for particle in game.particles:
             kill = particle.update()
-            particle.render(game.display, offset=render_scroll)
-            # If particle is leaf, make it's movement back and forth in x axis
-            if particle.type == "leaf":
-                particle.pos[0] += math.sin(particle.animation.frame * 0.035) * 0.3
+            particle.render(layer("effect"), offset=render_scroll)
             if kill:
-                game.particles.remove(particle)
+                game.particles.discard(particle)
+        game.particles.compact(game.pools["particle"].release)
 
         # Render fireballs and fireswings
         if game.is_game_started:
             # Render fireballs
-            for fireball in game.fireballs.copy():
+            game.collision.add_points(
+                "fireball",
+                game.fireballs,
+                [fireball.pos for fireball in game.fireballs],
+            )
+            player_hits = game.collision.point_hits("fireball")
+            for fireball in game.fireballs:
                 # If player hit fireball  ...
-                if game.player.rect().collidepoint(fireball.pos):
+                if fireball in player_hits:
                     game.player.blink += 1
                     # Decrease player energy
                     game.player.energy = max(0, game.player.energy + ENERGY["fireball"])
@@ -398,20 +422,23 @@ def main():
                         game.dead += 1
 
                 kill = fireball.update()
-                fireball.render(game.display, offset=render_scroll)
+                fireball.render(layer("effect"), offset=render_scroll)
                 # Add additional adjustment to position as needed
                 # fireball.pos[0] += math.sin(fireball.animation.frame * 0.035) * 0.3
                 if kill:
-                    game.fireballs.remove(fireball)
+                    game.fireballs.discard(fireball)
+            game.fireballs.compact(game.pools["particle"].release)
 
             # Render fireswings
-            for fireswing in game.fireswings.copy():
-                # If player hit fireswing  ...
-                if game.player.rect().collidepoint(fireswing.pos):
-                    game.player.blink += 1
+            player_hits = dict(game.collision.area_hits("fireswing"))
+            for fireswing in game.fireswings:
+                # If player hit fires of the fireswing ...
+                fires = player_hits.get(fireswing, 0)
+                if fires:
+                    game.player.blink += fires
                     # Decrease player energy
                     game.player.energy = max(
-                        0, game.player.energy + ENERGY["fireswing"]
+                        0, game.player.energy + fires * ENERGY["fireswing"]
                     )
                     game.sfx["hit_by_fire"].play()
                     # Trigger screen shake effect
@@ -420,16 +447,20 @@ def main():
                     if game.player.energy == 0:
                         game.dead += 1
 
-                _ = fireswing.update()
-                fireswing.render(game.display, offset=render_scroll)
+                fireswing.update()
+                fireswing.render(layer("effect"), offset=render_scroll)
+
+        # Draw all the blits collected above, one call per layer
+        game.render_queue.flush()
 
         # Render textmarks - score numbers when player hit the reward items
         # Textmark is 'object', and the spawn, update and remove will be self managed
-        for textmark in game.textmarks.copy():
+        for textmark in game.textmarks:
             kill = textmark.update()
             textmark.render(game.display, offset=render_scroll)
             if kill:
-                game.textmarks.remove(textmark)
+                game.textmarks.discard(textmark)
+        game.textmarks.compact(game.pools["textmark"].release)
 
         # Check key events
         quit_game = check_keyboard_input(game)
@@ -483,12 +514,6 @@ def main():
             random.random() * game.screenshake - game.screenshake / 2,
             random.random() * game.screenshake - game.screenshake / 2,
         )
-        game.screen.blit(
-            pygame.transform.scale(
-                game.display, game.display_sizes[game.display_size_id]
-            ),
-            screenshake_offset,
-        )
 
         # Count down the time
         # Count only if the game is already started
@@ -512,7 +537,12 @@ def main():
             save_score_highest(PATH_HIGHEST_SCORE, game.score)
 
         # Display all the objects, images, background, etc...
-        pygame.display.update()
+        # Intro, pause, game over and finale screens are static mostly,
+        # so only the regions changed are pushed to the window.
+        game.presenter.present(
+            screenshake_offset,
+            static=not game.is_game_started or game.paused or not game.lives,
+        )
         game.clock.tick(FRAME_RATE)
 
         # If paused is true, hold screen till any key pressed
@@ -527,6 +557,10 @@ def main():
                         game.time_paused += (
                             pygame.time.get_ticks() - game.time_right_before_pause
                         )  # ms
+                if event.type == pygame.WINDOWEXPOSED:
+                    pygame.display.update()
+            # Nothing to draw while waiting. Don't spin the CPU polling the events.
+            game.clock.tick(FRAME_RATE)
 
 
 # This is the program entry point:
@@ -1,4 +1,4 @@
-# animation.py - Animation class
+# animation.py - AnimationClip & Animation classes
 #
 # @author      : Chiho Kim (chiho80@gmail.com)
 # @file        : animation.py
@@ -8,27 +8,77 @@
 
 import pygame
 
+# Flip states (x, y) prepared for every frame at load
+FLIPS = ((False, False), (True, False), (False, True), (True, True))
+
+
+def build_atlas(images):
+    """Flip every frame in all the flip states, and make the mask of each one.
+    Return a dict of flip -> [(image, mask), ...]"""
+    atlas = {}
+    for flip in FLIPS:
+        frames = []
+        for img in images:
+            if flip != (False, False):
+                img = pygame.transform.flip(img, flip[0], flip[1])
+            frames.append((img, pygame.mask.from_surface(img)))
+        atlas[flip] = frames
+    return atlas
+
+
+class AnimationClip:
+    """Frames of an animation, loaded once and shared by everyone playing it.
+    Do not change it after load. Each entity or particle plays it with its own
+    Animation, which only keeps the current frame."""
+
+    __slots__ = ("images", "img_duration", "loop", "length", "frames")
 
-class Animation:
     def __init__(self, images, img_dur=5, loop=True):
-        self.images = images
-        self.loop = loop
+        self.images = tuple(images)
         self.img_duration = img_dur
-        self.done = False
-        self.frame = 0
+        self.loop = loop
+        self.length = img_dur * len(images)  # in game frames
+        # flip -> (image, mask) for each game frame, so that the image index
+        # (frame / img_duration) is not calculated at every call.
+        atlas = build_atlas(self.images)
+        self.frames = {
+            flip: tuple(
+                atlas[flip][int(frame / img_dur)] for frame in range(self.length)
+            )
+            for flip in FLIPS
+        }
 
-    def copy(self):
-        return Animation(self.images, self.img_duration, self.loop)
+    def play(self, frame=0):
+        """Return a new Animation playing this clip from frame"""
+        return Animation(self, frame)
+
+
+class Animation:
+    """Cursor playing an AnimationClip. It's small enough to make one
+    for every particle spawned."""
+
+    __slots__ = ("clip", "frame", "done")
+
+    def __init__(self, clip, frame=0):
+        self.reset(clip, frame)
+
+    def reset(self, clip, frame=0):
+        """Play clip from frame, reusing this cursor"""
+        self.clip = clip
+        self.frame = frame
+        self.done = False
 
     def update(self):
-        if self.loop:
-            self.frame = (self.frame + 1) % (self.img_duration * len(self.images))
+        if self.clip.loop:
+            self.frame = (self.frame + 1) % self.clip.length
         else:
-            self.frame = min(self.frame + 1, self.img_duration * len(self.images) - 1)
-            if self.frame >= self.img_duration * len(self.images) - 1:
+            self.frame = min(self.frame + 1, self.clip.length - 1)
+            if self.frame >= self.clip.length - 1:
                 self.done = True
 
     def img(self, flip=(False, False)):
-        return pygame.transform.flip(
-            self.images[int(self.frame / self.img_duration)], flip[0], flip[1]
-        )
+        return self.clip.frames[flip][self.frame][0]
+
+    def mask(self, flip=(False, False)):
+        """Mask of the image, to check collisions at pixel level"""
+        return self.clip.frames[flip][self.frame][1]
@@ -8,7 +8,7 @@
 
 import pygame
 from scripts.utils import load_image, load_images, set_volume
-from scripts.animation import Animation
+from scripts.animation import AnimationClip
 
 
 def load_asset_images():
@@ -119,77 +119,85 @@ def load_asset_images():
             ],
         },
         "clouds": load_images("clouds"),
-        "player/idle": Animation(load_images("entities/player/idle")),
-        "player/run": Animation(load_images("entities/player/run"), img_dur=4),
-        "player/jump": Animation(load_images("entities/player/jump")),
-        "player/fall": Animation(load_images("entities/player/fall")),
-        "player/hit": Animation(load_images("entities/player/hit"), img_dur=2),
-        "player/random1": Animation(
+        "player/idle": AnimationClip(load_images("entities/player/idle")),
+        "player/run": AnimationClip(load_images("entities/player/run"), img_dur=4),
+        "player/jump": AnimationClip(load_images("entities/player/jump")),
+        "player/fall": AnimationClip(load_images("entities/player/fall")),
+        "player/hit": AnimationClip(load_images("entities/player/hit"), img_dur=2),
+        "player/random1": AnimationClip(
             load_images("entities/player/random1"),
         ),
-        "player/random2": Animation(
+        "player/random2": AnimationClip(
             load_images("entities/player/random2"),
         ),
-        "player/random3": Animation(
+        "player/random3": AnimationClip(
             load_images("entities/player/random3"),
         ),
-        "player/random4": Animation(
+        "player/random4": AnimationClip(
             load_images("entities/player/random4"),
         ),
-        "player/wall_slide": Animation(load_images("entities/player/wall_slide")),
-        "player/winter/idle": Animation(load_images("entities/player_winter/idle")),
-        "player/winter/run": Animation(
+        "player/wall_slide": AnimationClip(load_images("entities/player/wall_slide")),
+        "player/winter/idle": AnimationClip(load_images("entities/player_winter/idle")),
+        "player/winter/run": AnimationClip(
             load_images("entities/player_winter/run"), img_dur=4
         ),
-        "player/winter/jump": Animation(load_images("entities/player_winter/jump")),
-        "player/winter/fall": Animation(load_images("entities/player_winter/fall")),
-        "player/winter/hit": Animation(
+        "player/winter/jump": AnimationClip(load_images("entities/player_winter/jump")),
+        "player/winter/fall": AnimationClip(load_images("entities/player_winter/fall")),
+        "player/winter/hit": AnimationClip(
             load_images("entities/player_winter/hit"), img_dur=2
         ),
-        "player/winter/random1": Animation(
+        "player/winter/random1": AnimationClip(
             load_images("entities/player_winter/random1"),
         ),
-        "player/winter/random2": Animation(
+        "player/winter/random2": AnimationClip(
             load_images("entities/player_winter/random2"),
         ),
-        "player/winter/random3": Animation(
+        "player/winter/random3": AnimationClip(
             load_images("entities/player_winter/random3"),
         ),
-        "player/winter/random4": Animation(
+        "player/winter/random4": AnimationClip(
             load_images("entities/player_winter/random4"),
         ),
-        "player/winter/wall_slide": Animation(
+        "player/winter/wall_slide": AnimationClip(
             load_images("entities/player_winter/wall_slide")
         ),
-        "squarrel1/idle": Animation(load_images("entities/squarrel1/idle"), img_dur=6),
-        "squarrel1/run": Animation(load_images("entities/squarrel1/run"), img_dur=4),
-        "squarrel2/idle": Animation(load_images("entities/squarrel2/idle"), img_dur=6),
-        "squarrel2/run": Animation(load_images("entities/squarrel2/run"), img_dur=4),
-        "cat/idle": Animation(load_images("entities/cat/idle"), img_dur=6),
-        "cat/run": Animation(load_images("entities/cat/run"), img_dur=4),
-        "cat/attack": Animation(load_images("entities/cat/attack"), img_dur=4),
-        "particle/leaf": Animation(
+        "squarrel1/idle": AnimationClip(
+            load_images("entities/squarrel1/idle"), img_dur=6
+        ),
+        "squarrel1/run": AnimationClip(
+            load_images("entities/squarrel1/run"), img_dur=4
+        ),
+        "squarrel2/idle": AnimationClip(
+            load_images("entities/squarrel2/idle"), img_dur=6
+        ),
+        "squarrel2/run": AnimationClip(
+            load_images("entities/squarrel2/run"), img_dur=4
+        ),
+        "cat/idle": AnimationClip(load_images("entities/cat/idle"), img_dur=6),
+        "cat/run": AnimationClip(load_images("entities/cat/run"), img_dur=4),
+        "cat/attack": AnimationClip(load_images("entities/cat/attack"), img_dur=4),
+        "particle/leaf": AnimationClip(
             load_images("particles/leaf", trans_color=(0, 0, 0)),
             img_dur=20,
             loop=False,
         ),
-        "particle/boostgas": Animation(
+        "particle/boostgas": AnimationClip(
             load_images("particles/boostgas", trans_color=(0, 0, 0)),
             img_dur=6,
             loop=False,
         ),
-        "particle/fireball": Animation(
+        "particle/fireball": AnimationClip(
             load_images("particles/fireball"),
             img_dur=3,
         ),
-        "particle/particle": Animation(
+        "particle/particle": AnimationClip(
             load_images("particles/particle", trans_color=(0, 0, 0)),
             img_dur=6,
             loop=False,
         ),
         "projectile": load_image("projectile.png"),
         "small_heads/bailey": load_image("small_heads/bailey.png"),
-        "particle/fireswing": Animation(
+        "particle/fireswing": AnimationClip(
             load_images("particles/fireswing"),
             img_dur=3,
         ),
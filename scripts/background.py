@@ -31,6 +31,10 @@ class BackgroundLayer:
         self.pos_original = position_initialize(
             list(image_dict["pos"]), self.img_size, self.surf_size
         )
+        self.reset()
+
+    def reset(self):
+        # Back to the initial position
         self.pos = [
             [self.pos_original[0] - self.img_size[0], self.pos_original[1]],
             [self.pos_original[0], self.pos_original[1]],
@@ -90,6 +94,10 @@ class Background:
         # By this, far background will move slower ...
         self.background_layers.sort(key=lambda x: x.depth)
 
+    def reset(self):
+        for background_image in self.background_layers:
+            background_image.reset()
+
     def update(self, surf, movement):
         for background_image in self.background_layers:
             background_image.update(movement)
@@ -0,0 +1,148 @@
+# chunk.py - ChunkRenderer class
+#
+# @author      : Chiho Kim (chiho80@gmail.com)
+# @file        : chunk.py
+# @created     : Sunday Oct 18, 2026 10:12 PT
+#
+# Copyright (c) 2026 Chiho Kim. All rights reserved.
+
+import math
+import pygame
+from scripts.utils import blit_all
+
+# Number of tiles along each side of a chunk
+CHUNK_SIZE = 16
+
+
+class ChunkRenderer:
+    """Bake the static ongrid tiles into chunk surfaces of CHUNK_SIZE x CHUNK_SIZE tiles.
+    Once baked, a frame costs a handful of chunk blits instead of a blit per tile.
+    Moving tiles are never baked. Tilemap.render draws them on top of the chunks.
+    """
+
+    def __init__(self, tilemap):
+        self.tilemap = tilemap
+        # (cx, cy) -> baked surface, or None if the chunk has nothing to draw
+        self.chunks = {}
+        # Chunks shared by all the attempts of a cached level (see Tilemap.restore).
+        # A chunk is taken from here unless it has been changed during this attempt.
+        self.shared_chunks = None
+        self.changed = set()
+        # Number of cells an image can stick out of its own cell to the right or bottom.
+        # Tiles of the neighboring chunks as far as this are baked into a chunk too.
+        self.overflow = 0
+
+    def image(self, tile):
+        return self.tilemap.game.assets[tile["type"]][tile["variant"]]
+
+    def chunk_pixels(self):
+        return CHUNK_SIZE * self.tilemap.tile_size
+
+    def update_overflow(self, tile):
+        img = self.image(tile)
+        self.overflow = max(
+            self.overflow,
+            math.ceil(
+                (max(img.get_width(), img.get_height()) - self.tilemap.tile_size)
+                / self.tilemap.tile_size
+            ),
+        )
+
+    def share(self, shared_chunks, overflow):
+        """Use the chunks baked for the pristine level, and bake into it from now on"""
+        self.chunks = {}
+        self.shared_chunks = shared_chunks
+        self.changed = set()
+        self.overflow = overflow
+
+    def invalidate_all(self):
+        """Drop every chunk. Call this when the whole map is loaded or changed."""
+        self.chunks = {}
+        self.shared_chunks = None
+        self.changed = set()
+        self.overflow = 0
+        for tile in self.tilemap.tilemap.values():
+            self.update_overflow(tile)
+
+    def invalidate(self, loc, tile):
+        """Drop only the chunks covered by the image of the tile at loc (x, y).
+        They will be baked again when they are rendered next time."""
+        self.update_overflow(tile)
+        img = self.image(tile)
+        chunk_pixels = self.chunk_pixels()
+        x = loc[0] * self.tilemap.tile_size
+        y = loc[1] * self.tilemap.tile_size
+        for cx in range(
+            x // chunk_pixels, (x + img.get_width() - 1) // chunk_pixels + 1
+        ):
+            for cy in range(
+                y // chunk_pixels, (y + img.get_height() - 1) // chunk_pixels + 1
+            ):
+                self.chunks.pop((cx, cy), None)
+                self.changed.add((cx, cy))
+
+    def bake(self, chunk_loc):
+        """Draw all the static tiles touching the chunk onto a new surface.
+        Tiles are drawn in the same order as Tilemap.render did (x first, then y)."""
+        tile_size = self.tilemap.tile_size
+        chunk_pixels = self.chunk_pixels()
+        surf = None
+        for x in range(
+            chunk_loc[0] * CHUNK_SIZE - self.overflow, (chunk_loc[0] + 1) * CHUNK_SIZE
+        ):
+            for y in range(
+                chunk_loc[1] * CHUNK_SIZE - self.overflow,
+                (chunk_loc[1] + 1) * CHUNK_SIZE,
+            ):
+                tile = self.tilemap.tilemap.get((x, y))
+                if not tile or tile["type"] == "movingtile":
+                    continue
+                if surf is None:
+                    surf = pygame.Surface((chunk_pixels, chunk_pixels), pygame.SRCALPHA)
+                surf.blit(
+                    self.image(tile),
+                    (
+                        x * tile_size - chunk_loc[0] * chunk_pixels,
+                        y * tile_size - chunk_loc[1] * chunk_pixels,
+                    ),
+                )
+        if surf:
+            # Most of a chunk is transparent (sky). RLE lets the blit skip those pixels.
+            surf.set_alpha(255, pygame.RLEACCEL)
+        self.chunks[chunk_loc] = surf
+        if self.shared_chunks is not None and chunk_loc not in self.changed:
+            self.shared_chunks[chunk_loc] = surf
+        return surf
+
+    def render(self, surf, offset=(0, 0)):
+        chunk_pixels = self.chunk_pixels()
+        blit_sequence = []
+        for cx in range(
+            offset[0] // chunk_pixels,
+            (offset[0] + surf.get_width() - 1) // chunk_pixels + 1,
+        ):
+            for cy in range(
+                offset[1] // chunk_pixels,
+                (offset[1] + surf.get_height() - 1) // chunk_pixels + 1,
+            ):
+                if (cx, cy) in self.chunks:
+                    chunk = self.chunks[(cx, cy)]
+                elif (
+                    self.shared_chunks is not None
+                    and (cx, cy) in self.shared_chunks
+                    and (cx, cy) not in self.changed
+                ):
+                    chunk = self.shared_chunks[(cx, cy)]
+                else:
+                    chunk = self.bake((cx, cy))
+                if chunk:
+                    blit_sequence.append(
+                        (
+                            chunk,
+                            (
+                                cx * chunk_pixels - offset[0],
+                                cy * chunk_pixels - offset[1],
+                            ),
+                        )
+                    )
+        blit_all(surf, blit_sequence)
@@ -0,0 +1,131 @@
+# collision.py - Collision class
+#
+# @author      : Chiho Kim (chiho80@gmail.com)
+# @file        : collision.py
+# @created     : Sunday Oct 18, 2026 21:40 PT
+#
+# Copyright (c) 2026 Chiho Kim. All rights reserved.
+
+from scripts.spatialhash import SpatialHash
+
+
+class Collision:
+    """Check the hazards (enemies, projectiles, fireballs, fireswings) against the player
+    in two phases. Hazards are registered into a spatial hash every frame,
+    or once for the level by the area they move within.
+    Broadphase finds the candidates around the player from it.
+    Narrowphase runs the exact test (mask overlap, rect, or point) on them only.
+    Counters tell how many got through each phase per frame.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        # Dynamic objects of this frame
+        self.objects = SpatialHash()
+        # Objects moving within a fixed area (ex. fireswings), registered
+        # by the area only once for the level, not to register them every frame
+        self.areas = SpatialHash()
+        # Counters of this frame
+        self.broadphase_candidates = 0
+        self.narrowphase_tests = 0
+        # Counters of the last frame finished
+        self.last_frame = {"broadphase_candidates": 0, "narrowphase_tests": 0}
+
+    def new_frame(self):
+        """Keep the counters of the frame just finished, and start a new frame"""
+        self.last_frame = {
+            "broadphase_candidates": self.broadphase_candidates,
+            "narrowphase_tests": self.narrowphase_tests,
+        }
+        self.broadphase_candidates = 0
+        self.narrowphase_tests = 0
+        self.objects.clear()
+
+    def add_entities(self, kind, entities):
+        """Register the entities where they are now. Their rects cover both
+        the entity rect and the mask, as both are placed at the position."""
+        insert = self.objects.insert
+        for entity in entities:
+            w, h = entity.size
+            if entity.mask:
+                mask_w, mask_h = entity.mask.get_size()
+                if mask_w > w:
+                    w = mask_w
+                if mask_h > h:
+                    h = mask_h
+            insert(kind, entity, entity.pos[0], entity.pos[1], w, h)
+
+    def add_area(self, kind, obj, area):
+        """Register obj which stays within area (x, y, w, h) until clear_areas()"""
+        self.areas.insert(kind, obj, *area)
+
+    def clear_areas(self):
+        self.areas.clear()
+
+    def add_points(self, kind, objects, points):
+        """Register the objects at the points, such as the positions of projectiles"""
+        insert = self.objects.insert
+        for obj, point in zip(objects, points):
+            insert(kind, obj, point[0], point[1])
+
+    def mask_hits(self, kind):
+        """Return the entities of kind whose masks overlap the player's mask,
+        in the order registered. mask is None until the entity is rendered."""
+        player = self.game.player
+        if not player.mask:
+            return []
+        # Positions are not truncated as the masks do.
+        # Allow 1 more pixel not to miss any pair they would hit.
+        player_w, player_h = player.mask.get_size()
+        candidates = self.objects.query(
+            kind, player.pos[0] - 1, player.pos[1] - 1, player_w + 2, player_h + 2
+        )
+        self.broadphase_candidates += len(candidates)
+
+        hits = []
+        for entity, *_ in candidates:
+            if entity.mask:
+                self.narrowphase_tests += 1
+                if entity.mask.overlap(
+                    player.mask,
+                    (player.pos[0] - entity.pos[0], player.pos[1] - entity.pos[1]),
+                ):
+                    hits.append(entity)
+        return hits
+
+    def rect_hits(self, kind):
+        """Return the entities of kind whose rects collide with the player's rect,
+        in the order registered"""
+        player_rect = self.game.player.rect()
+        candidates = self.objects.query(kind, *player_rect)
+        self.broadphase_candidates += len(candidates)
+        self.narrowphase_tests += len(candidates)
+        return [
+            entity
+            for entity, *_ in candidates
+            if entity.rect().colliderect(player_rect)
+        ]
+
+    def point_hits(self, kind):
+        """Return the objects of kind whose points are in the player's rect,
+        in the order registered"""
+        player_rect = self.game.player.rect()
+        candidates = self.objects.query(kind, *player_rect)
+        self.broadphase_candidates += len(candidates)
+        self.narrowphase_tests += len(candidates)
+        return [obj for obj, x, y, _, _ in candidates if player_rect.collidepoint(x, y)]
+
+    def area_hits(self, kind):
+        """Return (obj, hits) of the objects of kind registered by their areas
+        (see add_area), hitting the player's rect now, in the order registered.
+        They count their own hits with obj.hits(rect) (ex. Fireswing.hits)."""
+        player_rect = self.game.player.rect()
+        candidates = self.areas.query(kind, *player_rect)
+        self.broadphase_candidates += len(candidates)
+        self.narrowphase_tests += len(candidates)
+        hits = []
+        for obj, *_ in candidates:
+            count = obj.hits(player_rect)
+            if count:
+                hits.append((obj, count))
+        return hits
@@ -17,6 +17,23 @@ EXTRA_TIME_AFTER_DEAD = 15000  # ms
 # Camera tracking speed. The smaller the faster.
 CAMERA_SPEED = 10
 
+# Enemies farther than this (x, y pixels) out of the camera sleep.
+# Sleeping enemies do nothing (no physics, AI, nor render) and keep their state
+# until the camera comes near, then carry on from there.
+ENEMY_ACTIVE_MARGIN = (96, 64)
+
+# Enemies are spawned when the camera comes within this margin (x, y pixels)
+# of their spawners, instead of spawning all of them at the start of the level.
+# Set LAZY_SPAWNING False to spawn all of them at the start.
+LAZY_SPAWNING = True
+ENEMY_SPAWN_MARGIN = (160, 120)
+
+# Keep the patrol state of the enemies in arrays and decide their moves all at once
+# (see EnemySystem, needs NumPy). It pays off only with hundreds of awake enemies.
+# With a handful of them, as in the current levels, each enemy deciding by itself
+# is faster.
+ENEMY_SYSTEM = False
+
 # Frame rate - lower the better performance, higher for smoother motion
 FRAME_RATE = 60
 
@@ -118,13 +135,16 @@ VOLUME = {
 
 # Visual effects.
 VISUAL_EFFECT = {
-    "leaf": False,
-    "cloud": False,
+    "leaf": True,
+    "cloud": True,
     "boostgas": True,
     "hit": True,
     "spark": True,
 }
 
+# Seasons with falling leaves (see LeafField)
+LEAF_SEASONS = ("summer", "autumn")
+
 # Physics check down below (number of pixels) - must be larger than the tallest entity's height
 PHYSICS_CHECK_PIXELS_DOWN_BELOW = 25
 
@@ -18,6 +18,9 @@ def check_keyboard_input(game):
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             quit_game = True
+        if event.type == pygame.WINDOWEXPOSED:
+            # The window has to be redrawn as a whole
+            game.presenter.invalidate()
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_LEFT or event.key == pygame.K_a:
                 game.movement[0] = True
@@ -0,0 +1,37 @@
+# deferredlist.py - DeferredList class
+#
+# @author      : Chiho Kim (chiho80@gmail.com)
+# @file        : deferredlist.py
+# @created     : Sunday Oct 18, 2026 23:50 PT
+#
+# Copyright (c) 2026 Chiho Kim. All rights reserved.
+
+
+class DeferredList(list):
+    """List of the objects updated every frame (sparks, particles, enemies ...).
+    Items are marked with discard() while the list is iterated, and are removed
+    all at once by compact(), which keeps the order of the others. Iterating
+    the list itself is fine, no copy is needed. Marked items stay in the list
+    until compact(). Items appended while iterating are iterated too.
+    """
+
+    def __init__(self, items=()):
+        super().__init__(items)
+        self.removed = set()  # id of the items marked to be removed
+
+    def discard(self, item):
+        """Mark item to be removed at the next compact()"""
+        self.removed.add(id(item))
+
+    def compact(self, on_removed=None):
+        """Remove the marked items in one pass. on_removed(item) is called
+        for each of them (ex. Pool.release)"""
+        if not self.removed:
+            return
+        removed = self.removed
+        if on_removed:
+            for item in self:
+                if id(item) in removed:
+                    on_removed(item)
+        self[:] = [item for item in self if id(item) not in removed]
+        self.removed = set()
@@ -0,0 +1,181 @@
+# enemysystem.py - EnemySystem class
+#
+# @author      : Chiho Kim (chiho80@gmail.com)
+# @file        : enemysystem.py
+# @created     : Sunday Oct 18, 2026 18:30 PT
+#
+# Copyright (c) 2026 Chiho Kim. All rights reserved.
+
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional. Without it, each Enemy decides by itself (Enemy.patrol).
+    np = None
+
+from scripts.constants import VELOCITY, PHYSICS_CHECK_PIXELS_DOWN_BELOW
+
+# Walking duration (frames) chosen randomly when an enemy starts walking
+WALKING_FRAMES = {
+    "squarrel1": (30, 120),
+    "squarrel2": (30, 120),
+    "cat": (60, 180),
+}
+SHOOTERS = {"squarrel1", "squarrel2"}
+
+
+class EnemySystem:
+    """Keep the patrol state of all the enemies in NumPy arrays (one slot per enemy),
+    and decide where they walk, turn around, or shoot all at once in a few vectorized
+    steps. The decisions are the same as Enemy.patrol, except the random numbers
+    come from NumPy. The walking timer and flip of an enemy are kept here, and
+    Enemy.walking is not used. Enemy objects still do the physics, interact with
+    the player, and render. Their pos stays a list, as tile collision reads it one
+    by one, which is much slower on NumPy scalars. Positions of the walking ones
+    are gathered once per frame.
+    """
+
+    def __init__(self, game, capacity=64):
+        self.game = game
+        self.enemies = []  # slot -> Enemy
+        self.rng = np.random.default_rng(random.getrandbits(32))
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        """(Re)allocate the arrays, keeping the rows in use"""
+        n = len(self.enemies)
+        arrays = {
+            "walking": np.zeros(capacity, dtype=np.int32),  # timer (frames)
+            "speed": np.zeros(capacity),  # x delta while walking
+            "width": np.zeros(capacity, dtype=np.int32),
+            "walking_min": np.zeros(capacity, dtype=np.int32),
+            "walking_max": np.zeros(capacity, dtype=np.int32),
+            "shooter": np.zeros(capacity, dtype=bool),
+            # Enemies are turned around only here. Physics keeps it as it is.
+            "flip": np.zeros(capacity, dtype=bool),
+            # Patrol extents, as Enemy.patrol_extent. Version -1 is not computed yet.
+            "extent": np.full((capacity, 5), -1.0),
+        }
+        for name, array in arrays.items():
+            if n:
+                array[:n] = getattr(self, name)[:n]
+            setattr(self, name, array)
+
+    def add(self, enemy):
+        slot = len(self.enemies)
+        if slot == len(self.walking):
+            self.allocate(2 * len(self.walking))
+        self.enemies.append(enemy)
+        enemy.slot = slot
+        self.walking[slot] = enemy.walking
+        self.speed[slot] = VELOCITY[f"enemy_x_delta/{enemy.type}"]
+        self.width[slot] = enemy.size[0]
+        self.walking_min[slot], self.walking_max[slot] = WALKING_FRAMES[enemy.type]
+        self.shooter[slot] = enemy.type in SHOOTERS
+        self.flip[slot] = enemy.flip
+        self.extent[slot] = -1
+
+    def remove(self, enemy):
+        """Remove the enemy, moving the last one into its slot"""
+        slot = enemy.slot
+        last = len(self.enemies) - 1
+        if slot != last:
+            for array in (
+                self.walking,
+                self.speed,
+                self.width,
+                self.walking_min,
+                self.walking_max,
+                self.shooter,
+                self.flip,
+                self.extent,
+            ):
+                array[slot] = array[last]
+            self.enemies[slot] = self.enemies[last]
+            self.enemies[slot].slot = slot
+        self.enemies.pop()
+
+    def update(self, enemies):
+        """Update the enemies (the awake ones)"""
+        tilemap = self.game.tilemap
+        player = self.game.player
+        if not enemies:
+            return
+        slots = np.array([enemy.slot for enemy in enemies], dtype=np.intp)
+        walking = self.walking[slots]
+        was_walking = walking > 0
+
+        # Idle ones have 1% chance at each frame to start walking
+        start = ~was_walking & (self.rng.random(len(enemies)) < 0.01)
+        walking[start] = self.rng.integers(
+            self.walking_min[slots[start]], self.walking_max[slots[start]] + 1
+        )
+        walking[was_walking] -= 1
+        self.walking[slots] = walking
+
+        # Only the walking ones go on. Gather what physics changed in the last frame
+        # (position, and whether it hit a wall) from them in one pass.
+        walkers = np.flatnonzero(was_walking)
+        dx = np.zeros(len(enemies))
+        if len(walkers):
+            state = []
+            for i in walkers.tolist():
+                enemy = enemies[i]
+                collisions = enemy.collisions
+                state += (
+                    enemy.pos[0],
+                    enemy.pos[1],
+                    collisions["left"] or collisions["right"],
+                )
+            state = np.array(state, dtype=float).reshape(len(walkers), 3)
+            x = state[:, 0]
+            y = state[:, 1]
+            wall = state[:, 2] != 0
+            walker_slots = slots[walkers]
+            flip = self.flip[walker_slots]
+
+            # Check tile in front (7 or -7 pixels) and down below.
+            # It's on the ground if it's within the patrol extent (see Enemy.ground_ahead).
+            probe_x = (
+                np.trunc(x) + self.width[walker_slots] // 2 + np.where(flip, -7, 7)
+            )
+            probe_y = y + PHYSICS_CHECK_PIXELS_DOWN_BELOW
+            ground = (
+                (self.extent[walker_slots, 0] == tilemap.solid_version)
+                & (self.extent[walker_slots, 1] <= probe_x)
+                & (probe_x < self.extent[walker_slots, 2])
+                & (self.extent[walker_slots, 3] <= probe_y)
+                & (probe_y < self.extent[walker_slots, 4])
+            )
+            # Look up the run of solid tiles for the ones off their extents
+            for i in np.flatnonzero(~ground).tolist():
+                run = tilemap.solid_run((probe_x[i], probe_y[i]))
+                if run:
+                    ground[i] = True
+                    self.extent[walker_slots[i]] = (tilemap.solid_version,) + run
+
+            # Turn around at the walls and the edges, otherwise walk
+            turn = ~ground | wall
+            flip ^= turn
+            self.flip[walker_slots] = flip
+            speed = self.speed[walker_slots]
+            dx[walkers] = np.where(turn, 0.0, np.where(flip, -speed, speed))
+            for i in walkers[turn].tolist():
+                enemies[i].flip = not enemies[i].flip
+
+            # Squarrels shoot when they stop walking, if the player is in front of them
+            if self.game.is_game_started:
+                dis_x = player.pos[0] - x
+                shoot = (
+                    (walking[walkers] == 0)
+                    & self.shooter[walker_slots]
+                    & (abs(player.pos[1] - y) < 16)
+                    & np.where(flip, dis_x < 0, dis_x > 0)
+                )
+                for i in walkers[shoot].tolist():
+                    enemies[i].shoot()
+
+        # Physics
+        for enemy, enemy_dx in zip(enemies, dx.tolist()):
+            enemy.act(tilemap, (enemy_dx, 0))
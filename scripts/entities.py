@@ -9,9 +9,6 @@
 import math
 import pygame
 import random
-from scripts.particle import Particle
-from scripts.spark import Spark
-from scripts.textmark import TextMark
 from scripts.constants import (
     ENERGY,
     SCORE,
@@ -48,7 +45,7 @@ class PhysicsEntity:
     def set_action(self, action):
         if action != self.action:
             self.action = action
-            self.animation = self.game.assets[self.type + "/" + self.action].copy()
+            self.animation = self.game.assets[self.type + "/" + self.action].play()
 
     def drawrect(self, color, rect):
         pygame.draw.rect(
@@ -71,7 +68,7 @@ class PhysicsEntity:
         # Check collides with ongrid tiles & adjust position (x)
         entity_rect = self.rect()
         for rects in rects_physics:
-            rect = rects["rect"]
+            rect = rects.rect
             # For debugging, draw rect around
             # self.drawrect(COLORS["red"], rect)
             if entity_rect.colliderect(rect):
@@ -103,7 +100,7 @@ class PhysicsEntity:
         # Check collides with ongrid tiles & adjust position (x)
         entity_rect = self.rect()
         for rects in rects_physics:
-            rect = rects["rect"]
+            rect = rects.rect
             # For debugging, draw rect around
             # self.drawrect(COLORS["red"], rect)
             if entity_rect.colliderect(rect):
@@ -115,7 +112,7 @@ class PhysicsEntity:
                     entity_rect.bottom = rect.top
                     self.collisions["down"] = True
                     # Adjust x if player is on the bottom tile which touching is moving....
-                    dx = rects.get("dx", 0)
+                    dx = rects.dx
                     self.pos[0] += dx
                 # If collide during moving up ...
                 if frame_movement[1] < 0:
@@ -160,15 +157,15 @@ class PhysicsEntity:
     def render(self, surf, offset=(0, 0)):
         # Draw entity image
         surf.blit(
-            pygame.transform.flip(self.animation.img(), self.flip, False),
+            self.animation.img((self.flip, False)),
             (
                 self.pos[0] - offset[0] + self.anim_offset[0],
                 self.pos[1] - offset[1] + self.anim_offset[1],
             ),
         )
 
-        # To use for collision check, update the mask
-        self.mask = pygame.mask.from_surface(self.animation.img())
+        # To use for collision check, update the mask (as it's rendered)
+        self.mask = self.animation.mask((self.flip, False))
         # surf.blit(
         #     self.mask.to_surface(),
         #     (
@@ -186,17 +183,43 @@ class Enemy(PhysicsEntity):
 
         # Timer
         self.walking = 0
+        # Walkable extent of the platform the enemy checks the ground ahead on:
+        # (tilemap.solid_version, x_min, x_max, y_min, y_max). See ground_ahead.
+        self.patrol_extent = None
+
+    def ground_ahead(self, tilemap):
+        """Check if there is a solid tile in front and down below, as solid_check does.
+        The run of solid tiles the enemy walks on is looked up once, then it's just
+        a bounds check until the enemy goes off it, or tiles are added or removed."""
+        # Check tile in front (7 or -7 pixels) and down below (25 pixels)
+        # Careful to use numbers other than 7. Entity may keep flipping back and forth.
+        # int() truncates as rect() does, so this is rect().centerx +/- 7.
+        x = int(self.pos[0]) + self.size[0] // 2 + (-7 if self.flip else 7)
+        y = self.pos[1] + PHYSICS_CHECK_PIXELS_DOWN_BELOW
+        extent = self.patrol_extent
+        if (
+            extent
+            and extent[0] == tilemap.solid_version
+            and extent[1] <= x < extent[2]
+            and extent[3] <= y < extent[4]
+        ):
+            return True
+        run = tilemap.solid_run((x, y))
+        if not run:
+            # Keep the extent. The enemy is at its edge, and will turn around.
+            return False
+        self.patrol_extent = (tilemap.solid_version,) + run
+        return True
 
     def update(self, tilemap, movement=(0, 0)):
+        movement = self.patrol(tilemap, movement)
+        self.act(tilemap, movement)
+
+    def patrol(self, tilemap, movement=(0, 0)):
+        """Decide where to walk, turn around, or shoot. Return the movement.
+        EnemySystem makes these decisions for all the enemies at once instead."""
         if self.walking:
-            # Check tile in front (7 or -7 pixels) and down below (25 pixels)
-            # Careful to use numbers other than 7. Entity may keep flipping back and forth.
-            if tilemap.solid_check(
-                (
-                    self.rect().centerx + (-7 if self.flip else 7),
-                    self.pos[1] + PHYSICS_CHECK_PIXELS_DOWN_BELOW,
-                )
-            ):
+            if self.ground_ahead(tilemap):
                 # Entity is on the solid tile, and position to move is also solid.
                 if self.collisions["right"] or self.collisions["left"]:
                     # If hit the wall, flip
@@ -231,42 +254,9 @@ class Enemy(PhysicsEntity):
                     )
                     if abs(dis[1]) < 16:
                         # If player is looking left, and is left to the enemy, shot!
-                        if self.flip and dis[0] < 0:
-                            self.game.sfx["shoot"].play()
-                            self.game.projectiles.append(
-                                [
-                                    [self.rect().centerx - 7, self.rect().centery],
-                                    -1.5,
-                                    0,
-                                ]
-                            )
-                            for _ in range(4 * VISUAL_EFFECT["spark"]):
-                                # Genenrate (spawn) the spark for the latest projectile
-                                self.game.sparks.append(
-                                    Spark(
-                                        self.game.projectiles[-1][0],
-                                        random.random() - 0.5 + math.pi,
-                                        2 + random.random(),
-                                        size=(1, 2),
-                                    )
-                                )
-
                         # If player is looking right, and is right to the enemy, shot!
-                        if not self.flip and dis[0] > 0:
-                            self.game.sfx["shoot"].play()
-                            self.game.projectiles.append(
-                                [[self.rect().centerx + 7, self.rect().centery], 1.5, 0]
-                            )
-                            for _ in range(4 * VISUAL_EFFECT["spark"]):
-                                # Genenrate (spawn) the spark for the latest projectile
-                                self.game.sparks.append(
-                                    Spark(
-                                        self.game.projectiles[-1][0],
-                                        random.random() - 0.5,
-                                        2 + random.random(),
-                                        size=(1, 2),
-                                    )
-                                )
+                        if (self.flip and dis[0] < 0) or (not self.flip and dis[0] > 0):
+                            self.shoot()
 
         elif random.random() < 0.01:
             # 1% chance at each frame, can be triggered to walk
@@ -276,6 +266,36 @@ class Enemy(PhysicsEntity):
                 # cat
                 self.walking = random.randint(60, 180)
 
+        return movement
+
+    def shoot(self):
+        """Spawn a projectile toward the direction the enemy is looking"""
+        self.game.sfx["shoot"].play()
+        pools = self.game.pools
+        if self.flip:
+            self.game.projectiles.append(
+                pools["projectile"].acquire(
+                    (self.rect().centerx - 7, self.rect().centery), -1.5
+                )
+            )
+        else:
+            self.game.projectiles.append(
+                pools["projectile"].acquire(
+                    (self.rect().centerx + 7, self.rect().centery), 1.5
+                )
+            )
+        for _ in range(4 * VISUAL_EFFECT["spark"]):
+            # Genenrate (spawn) the spark for the latest projectile
+            self.game.sparks.add(
+                self.game.projectiles[-1].pos,
+                random.random() - 0.5 + (math.pi if self.flip else 0),
+                2 + random.random(),
+                size=(1, 2),
+            )
+
+    def act(self, tilemap, movement=(0, 0)):
+        """Move by physics. Hits between this enemy and player are checked
+        for all the enemies at once after this (see main.py)."""
         super().update(tilemap, movement=movement)
 
         # Set enemy's current action
@@ -284,75 +304,64 @@ class Enemy(PhysicsEntity):
         else:
             self.set_action("idle")
 
-        # If this enemy hits player not during dashing, reduce energy of player
-        # and make player's speed reduced & move backward
-        # if self.rect().colliderect(self.game.player.rect()):
+    def hit_player(self):
+        """This enemy hits player (their masks overlap, see Collision.mask_hits).
+        If player is not dashing, reduce energy of player
+        and make player's speed reduced & move backward"""
         # Earlier, the collision check was done using the rect of each entity.
         # Now, we are using mask to make more precise pixel level checking.
-        # mask is None when the game is just started. To avoid error, check
-        # first if masks are created.
-        if (self.mask and self.game.player.mask) and self.mask.overlap(
-            self.game.player.mask,
-            (
-                self.game.player.pos[0] - self.pos[0],
-                self.game.player.pos[1] - self.pos[1],
-            ),
-        ):
-            if not self.game.player.dashing:
-                # Trigger blinking
-                self.game.player.blink += 1
-                self.game.player.energy = max(
-                    0, self.game.player.energy + ENERGY[self.type]
-                )
-                # TODO show any animation when energy is reducing?
-                self.game.player.set_action("hit")
-
-                self.game.sfx["hit_by_enemy"].play()
-            if self.game.player.energy == 0:
-                if not self.game.dead:
-                    # Trigger screen shake effect
-                    self.game.screenshake = max(16, self.game.screenshake)
-                self.game.dead += 1
-
-            # Player bounce direction.
-            # After bouncing effect is finished, main.py will update
-            # the bounce_direction with zero (0).
-            if self.game.player.pos[0] > self.pos[0]:
-                self.game.player.bounce_direction = 1
-            else:
-                self.game.player.bounce_direction = -1
+        if not self.game.player.dashing:
+            # Trigger blinking
+            self.game.player.blink += 1
+            self.game.player.energy = max(
+                0, self.game.player.energy + ENERGY[self.type]
+            )
+            # TODO show any animation when energy is reducing?
+            self.game.player.set_action("hit")
 
-        # If enemy got attack (dash) by player...
-        if abs(self.game.player.dashing) >= 50:
-            if self.rect().colliderect(self.game.player.rect()):
+            self.game.sfx["hit_by_enemy"].play()
+        if self.game.player.energy == 0:
+            if not self.game.dead:
                 # Trigger screen shake effect
                 self.game.screenshake = max(16, self.game.screenshake)
-                self.game.sfx["hit_on_enemy"].play()
+            self.game.dead += 1
 
-                # Update score and spawn textmark
-                self.game.score += SCORE[self.type]
-                self.game.textmarks.append(
-                    TextMark(
-                        self.game.player.rect(),
-                        str(SCORE[self.type]),
-                        self.game.font["text_size5"],
-                        COLORS["white"],
-                        COLORS["black"],
-                        3,
-                    )
-                )
+        # Player bounce direction.
+        # After bouncing effect is finished, main.py will update
+        # the bounce_direction with zero (0).
+        if self.game.player.pos[0] > self.pos[0]:
+            self.game.player.bounce_direction = 1
+        else:
+            self.game.player.bounce_direction = -1
+
+    def killed_by_player(self):
+        """This enemy got attack (dash) by player (see Collision.rect_hits).
+        Add the score, and show the effects."""
+        # Trigger screen shake effect
+        self.game.screenshake = max(16, self.game.screenshake)
+        self.game.sfx["hit_on_enemy"].play()
+
+        # Update score and spawn textmark
+        self.game.score += SCORE[self.type]
+        self.game.textmarks.append(
+            self.game.pools["textmark"].acquire(
+                self.game.player.rect(),
+                str(SCORE[self.type]),
+                self.game.font["text_size5"],
+                COLORS["white"],
+                COLORS["black"],
+                3,
+            )
+        )
 
-                # Spawn sparks
-                for _ in range(8 * VISUAL_EFFECT["spark"]):
-                    angle = random.random() * math.pi * 2
-                    self.game.sparks.append(
-                        Spark(
-                            self.rect().center,
-                            angle,
-                            1 + random.random(),
-                        )
-                    )
-                return True
+        # Spawn sparks
+        for _ in range(8 * VISUAL_EFFECT["spark"]):
+            angle = random.random() * math.pi * 2
+            self.game.sparks.add(
+                self.rect().center,
+                angle,
+                1 + random.random(),
+            )
 
     def render(self, surf, offset=(0, 0)):
         """Enemy may has weapon such as gun. Render the weapon when needed"""
@@ -424,7 +433,7 @@ class Player(PhysicsEntity):
 
         # If player hit reward, add +10 to score, generate textmark and increase energy +0.5
         for reward_tile in tilemap.reward_tiles_around(self):
-            tile_loc = f"{reward_tile['pos'][0]};{reward_tile['pos'][1]}"
+            tile_loc = (reward_tile["pos"][0], reward_tile["pos"][1])
             tile = tilemap.tilemap[tile_loc]
             rect = pygame.Rect(
                 tile["pos"][0] * tilemap.tile_size + 3,
@@ -441,7 +450,7 @@ class Player(PhysicsEntity):
                     30, self.game.player.energy + ENERGY["fruit"]
                 )
                 self.game.textmarks.append(
-                    TextMark(
+                    self.game.pools["textmark"].acquire(
                         self.game.player.rect(),
                         str(SCORE["fruit"]),
                         self.game.font["text_size5"],
@@ -450,7 +459,7 @@ class Player(PhysicsEntity):
                         3,
                     )
                 )
-                del tilemap.tilemap[tile_loc]
+                tilemap.remove_tile(tile_loc)
 
         # If player passed the finishline tile, set levelcleared = True
         # The tilemap MUST have at least one finishline tile!
@@ -516,7 +525,7 @@ class Player(PhysicsEntity):
                     speed = random.random() * 0.5 + 0.5
                     pvelocity = [math.cos(angle) * speed, math.sin(angle) * speed]
                     self.game.particles.append(
-                        Particle(
+                        self.game.pools["particle"].acquire(
                             self.game,
                             "boostgas",
                             self.rect().center,
@@ -547,7 +556,7 @@ class Player(PhysicsEntity):
                         0,
                     ]
                     self.game.particles.append(
-                        Particle(
+                        self.game.pools["particle"].acquire(
                             self.game,
                             "boostgas",
                             self.rect().center,
@@ -567,8 +576,8 @@ class Player(PhysicsEntity):
         else:
             self.velocity[0] = min(self.velocity[0] + 0.1, 0)
 
-        # To use for collision check, update the mask
-        self.mask = pygame.mask.from_surface(self.animation.img())
+        # To use for collision check, update the mask (as it's rendered)
+        self.mask = self.animation.mask((self.flip, False))
 
     def render(self, surf, offset=(0, 0)):
         # Use this to hide the palyer for the first 10 frames
@@ -0,0 +1,121 @@
+# fireswing.py - Fireswing class
+#
+# @author      : Chiho Kim (chiho80@gmail.com)
+# @file        : fireswing.py
+# @created     : Monday Oct 19, 2026 02:00 PT
+#
+# Copyright (c) 2026 Chiho Kim. All rights reserved.
+
+import math
+from scripts.utils import blit_all
+
+# Number of angles in the lookup tables, over a full turn
+LUT_SIZE = 1024
+# cos and sin of the angles (2 * pi * i / LUT_SIZE)
+COS = tuple(math.cos(2 * math.pi * i / LUT_SIZE) for i in range(LUT_SIZE))
+SIN = tuple(math.sin(2 * math.pi * i / LUT_SIZE) for i in range(LUT_SIZE))
+
+
+class Fireswing:
+    """Arm of fires (length of them, unit_length apart) swinging around center.
+    The angle is theta * pi as the fireswing Particles had, and its cos and sin
+    are looked up from the tables once per frame. Then the fires are placed
+    along the arm from them. All the fires play the same animation.
+    """
+
+    def __init__(self, game, center, velocity, initial_theta, length, unit_length):
+        self.game = game
+        self.center = center
+        self.velocity = velocity  # theta per frame
+        self.theta = initial_theta
+        self.length = length
+        self.unit_length = unit_length
+        self.reach = (length - 1) * unit_length  # center to the last fire
+        self.animation = game.assets["particle/fireswing"].play()
+        self.look_up()
+
+    def look_up(self):
+        i = round(self.theta * LUT_SIZE / 2) % LUT_SIZE
+        self.cos = COS[i]
+        self.sin = SIN[i]
+
+    def area(self):
+        """Rect (x, y, w, h) the fires swing within"""
+        return (
+            self.center[0] - self.reach,
+            self.center[1] - self.reach,
+            2 * self.reach,
+            2 * self.reach,
+        )
+
+    def fire_pos(self, i):
+        offset = i * self.unit_length
+        return (
+            self.center[0] + self.cos * offset,
+            self.center[1] + self.sin * offset,
+        )
+
+    def hits(self, rect):
+        """Return the number of fires in rect (as rect.collidepoint on each).
+        The fires are on the segment from the center to the last fire, so the
+        ones in rect are consecutive. Clip the segment by rect grown by 1 pixel
+        (collidepoint truncates the point), then check the fires at both ends
+        of the clipped part only."""
+        t_min, t_max = 0.0, 1.0
+        for p, d, low, high in (
+            (self.center[0], self.cos * self.reach, rect.left - 1, rect.right + 1),
+            (self.center[1], self.sin * self.reach, rect.top - 1, rect.bottom + 1),
+        ):
+            if d:
+                t_low = (low - p) / d
+                t_high = (high - p) / d
+                if t_low > t_high:
+                    t_low, t_high = t_high, t_low
+                t_min = max(t_min, t_low)
+                t_max = min(t_max, t_high)
+            elif not low <= p <= high:
+                return 0
+        last = self.length - 1
+        first = max(0, math.ceil(t_min * last) - 1)
+        end = min(last, math.floor(t_max * last) + 1)
+        if first > end:
+            return 0
+        while first <= end and not rect.collidepoint(self.fire_pos(first)):
+            first += 1
+        while end >= first and not rect.collidepoint(self.fire_pos(end)):
+            end -= 1
+        return end - first + 1
+
+    def update(self):
+        self.theta += self.velocity
+        if self.theta > 2:
+            self.theta = 0
+        self.look_up()
+        self.animation.update()
+
+    def render(self, surf, offset=(0, 0)):
+        # Skip the ones off the surface
+        x, y, w, h = self.area()
+        img = self.animation.img()
+        if (
+            x - offset[0] - img.get_width() >= surf.get_width()
+            or y - offset[1] - img.get_height() >= surf.get_height()
+            or x + w - offset[0] + img.get_width() < 0
+            or y + h - offset[1] + img.get_height() < 0
+        ):
+            return
+        x = self.center[0] - offset[0] - img.get_width() // 2
+        y = self.center[1] - offset[1] - img.get_height() // 2
+        blit_all(
+            surf,
+            [
+                (
+                    img,
+                    (
+                        x + self.cos * i * self.unit_length,
+                        y + self.sin * i * self.unit_length,
+                    ),
+                )
+                for i in range(self.length)
+            ],
+        )
@@ -8,11 +8,25 @@
 
 
 import pygame
+from bisect import bisect_left, bisect_right
 from scripts.statusboard import StatusBoard
 from scripts.background import Background
 from scripts.constants import *
 from scripts.entities import Player, Enemy
 from scripts.tilemap import Tilemap
+from scripts.levelcache import LevelCache
+from scripts.enemysystem import EnemySystem, np
+from scripts.sparksystem import SparkSystem, SparkList
+from scripts.leaffield import LeafField, LeafList
+from scripts.collision import Collision
+from scripts.renderqueue import RenderQueue
+from scripts.presenter import Presenter
+from scripts.pool import Pool
+from scripts.deferredlist import DeferredList
+from scripts.particle import Particle
+from scripts.spark import Spark
+from scripts.textmark import TextMark
+from scripts.projectile import Projectile
 from scripts.clouds import Clouds
 from scripts.asset import load_asset_images, load_asset_sfx, load_asset_fonts
 from scripts.utils import load_score_highest, resize_screen, play_bgm
@@ -80,6 +94,13 @@ class Game:
         # Initiate tilemap
         self.tilemap = Tilemap(self, tile_size=16)
 
+        # Parsed levels. Levels are parsed only once, then reused when
+        # the level is loaded again (ex. respawn after death)
+        self.level_cache = LevelCache(self)
+
+        # Background for each season, created when needed
+        self.backgrounds = {}
+
         # Read the highest score from the file
         self.score_highest = load_score_highest(PATH_HIGHEST_SCORE)
 
@@ -100,6 +121,40 @@ class Game:
         # Parameter for shaking screen when impact on player is made.
         self.screenshake = 0
 
+        # Collision checks of the hazards against the player
+        self.collision = Collision(self)
+
+        # Blits of a frame, drawn onto the display one layer at a time
+        self.render_queue = RenderQueue(self.display)
+
+        # Scales the display up to the window, and pushes it to the screen
+        self.presenter = Presenter(self)
+
+        # Pools of the short-lived objects. They are acquired from here,
+        # and released back when removed, to be reused (see Pool).
+        self.pools = {
+            "particle": Pool(Particle),
+            "spark": Pool(Spark),
+            "textmark": Pool(TextMark),
+            "projectile": Pool(Projectile),
+        }
+        # Collections of them, filled while the level is played
+        self.projectiles = DeferredList()
+        self.fireballs = DeferredList()
+        self.fireswings = DeferredList()
+        self.particles = DeferredList()
+        self.textmarks = DeferredList()
+        # Sparks are kept in arrays, or Spark objects without NumPy
+        self.sparks = (
+            SparkSystem() if np is not None else SparkList(self.pools["spark"])
+        )
+        # Falling leaves, in arrays or leaf Particles without NumPy
+        self.leaves = (
+            LeafField(self.assets["particle/leaf"])
+            if np is not None
+            else LeafList(self)
+        )
+
         # CRT overlay effect
         self.crts = [None] + [key for key in self.assets if key.startswith("crt")]
         self.crt_id = 0
@@ -113,14 +168,70 @@ class Game:
         # Use level = -1 for dev mode.
         self.level = first_level
         self.season = LEVELS[str(self.level)]["season"]
-        self.background = Background(
-            self.display, self.assets["background"], season=self.season
-        )
+        self.background = self.get_background(self.season)
         self.lives = FIRST_LIVES
         self.score = 0
         self.finale = False
         self.load_level(self.level)
 
+    def get_background(self, season):
+        """Return the background of the season. It is created only once per season,
+        and reset to its initial scroll for every attempt."""
+        if season not in self.backgrounds:
+            self.backgrounds[season] = Background(
+                self.display, self.assets["background"], season=season
+            )
+        self.backgrounds[season].reset()
+        return self.backgrounds[season]
+
+    def activity_rect(self, margin):
+        """Rect of the camera, grown by margin (x, y) on every side"""
+        return pygame.Rect(
+            int(self.scroll[0]) - margin[0],
+            int(self.scroll[1]) - margin[1],
+            self.display.get_width() + 2 * margin[0],
+            self.display.get_height() + 2 * margin[1],
+        )
+
+    def spawn_enemy(self, i):
+        """Spawn an enemy at the i-th enemy spawner"""
+        spawner = self.enemy_spawners[i]
+        if spawner["variant"] == 1:
+            enemy_key = "squarrel1"
+            size = (20, 18)
+        if spawner["variant"] == 2:
+            enemy_key = "squarrel2"
+            size = (20, 18)
+        if spawner["variant"] == 3:
+            enemy_key = "cat"
+            size = (32, 24)
+        enemy = Enemy(self, spawner["pos"], size, enemy_key=enemy_key)
+        self.enemies.append(enemy)
+        if self.enemy_system:
+            self.enemy_system.add(enemy)
+        self.spawned.add(i)
+
+    def spawn_enemies(self):
+        """Spawn the enemies whose spawners are within ENEMY_SPAWN_MARGIN of the camera.
+        Spawners are sorted by x, so only the ones in the x range are looked at."""
+        spawn_rect = self.activity_rect(ENEMY_SPAWN_MARGIN)
+        for i in range(
+            bisect_left(self.enemy_spawner_xs, spawn_rect.left),
+            bisect_right(self.enemy_spawner_xs, spawn_rect.right),
+        ):
+            if i not in self.spawned and (
+                spawn_rect.top <= self.enemy_spawners[i]["pos"][1] <= spawn_rect.bottom
+            ):
+                self.spawn_enemy(i)
+
+    def awake_enemies(self):
+        """Return the enemies inside the activity region around the camera.
+        The others are sleeping in this frame (see ENEMY_ACTIVE_MARGIN)."""
+        activity_rect = self.activity_rect(ENEMY_ACTIVE_MARGIN)
+        return [
+            enemy for enemy in self.enemies if activity_rect.collidepoint(enemy.pos)
+        ]
+
     def load_level(self, map_id, passed_checkpoint_pos=None, reset_time=True):
         """Load level map, spawn all entites,
         and get ready to generate particles, spakrs and projectiles render ready,
@@ -130,19 +241,15 @@ class Game:
         when the level is started.
         passed_checkpoint_pos will be one of the checkpoint positions or None.
         """
-        # Load level map
-        try:
-            self.tilemap.load(LEVELS[str(map_id)]["map"])
-        except:
-            # TODO can do this better
-            self.tilemap.load(LEVELS["1"]["map"])
+        # Get the parsed level from the cache, and start a new attempt on the tilemap.
+        # Tiles removed during the attempt (ex. rewards) will come back at the next attempt.
+        level = self.level_cache.get(map_id)
+        self.tilemap.restore(level["tilemap"])
 
         # Update level and background assets
         self.level = map_id
         self.season = LEVELS[str(self.level)]["season"]
-        self.background = Background(
-            self.display, self.assets["background"], season=self.season
-        )
+        self.background = self.get_background(self.season)
 
         # If the music has been already playing, it won't replayed.
         play_bgm(self, music_key=self.season)
@@ -153,67 +260,53 @@ class Game:
         else:
             self.player.type = "player"
 
-        # Collect leaf spawners (trees)
-        self.leaf_spawners = []
-        if VISUAL_EFFECT["leaf"]:
-            for tree in self.tilemap.extract([("decor/tree", 1)], keep=True):
-                self.leaf_spawners.append(
-                    pygame.Rect(4 + tree["pos"][0], 4 + tree["pos"][1], 23, 13)
-                )
-
-        # Collect fireball spawners
-        self.fireball_spawners = []
-        for firehole in self.tilemap.extract([("decor/firehole", 0)], keep=True):
-            self.fireball_spawners.append(
-                pygame.Rect(firehole["pos"][0], firehole["pos"][1], 16, 16)
-            )
-
-        # Collect fireswing spawners
-        self.fireswing_spawners = []
-        for fireswing in self.tilemap.extract([("decor/fireswing", 0)], keep=True):
-            self.fireswing_spawners.append(
-                pygame.Rect(fireswing["pos"][0], fireswing["pos"][1], 16, 16)
-            )
+        # Spawners are collected when the level is parsed (see LevelCache.parse)
+        self.leaf_spawners = list(level["leaf_spawners"])
+        self.leaves.set_spawners(
+            self.leaf_spawners if self.season in LEAF_SEASONS else ()
+        )
+        self.fireball_spawners = list(level["fireball_spawners"])
+        self.fireswing_spawners = list(level["fireswing_spawners"])
 
         # Create (spawn) entities (player and enemy) at spawners
-        self.enemies = []
-        for spawner in self.tilemap.extract(
-            [("spawners", 0), ("spawners", 1), ("spawners", 2), ("spawners", 3)]
-        ):
+        for spawner in level["spawners"]:
             if spawner["variant"] == 0:
                 # Spawn player. Predefined position for player (70, 20) will be ignored.
-                self.player.pos = (
+                # Copy the position as player moves it in place.
+                self.player.pos = list(
                     passed_checkpoint_pos if passed_checkpoint_pos else spawner["pos"]
                 )
-                self.player.pos_at_start = spawner["pos"]
-            else:
-                # Spawn enemy
-                if spawner["variant"] == 1:
-                    enemy_key = "squarrel1"
-                    size = (20, 18)
-                if spawner["variant"] == 2:
-                    enemy_key = "squarrel2"
-                    size = (20, 18)
-                if spawner["variant"] == 3:
-                    enemy_key = "cat"
-                    size = (32, 24)
-                self.enemies.append(
-                    Enemy(self, spawner["pos"], size, enemy_key=enemy_key)
-                )
+                self.player.pos_at_start = list(spawner["pos"])
 
-        # Collect checkpoint positions
-        self.checkpoints = []
-        for checkpoint in self.tilemap.extract([("checkpoint", 0)]):
-            if checkpoint["variant"] == 0:
-                # We need only one variant (value = 0), and we only have that in the tile maps.
-                # I left this if clause for later change, which is not likely happening though...
-                self.checkpoints.append(checkpoint["pos"])
-        self.projectiles = []  # Collections for projectiles
-        self.fireballs = []  # Collections for fireballs
-        self.fireswings = []  # Collections for fires in many fireswings
-        self.particles = []  # Collections for particles
-        self.sparks = []  # Collections for sparks
-        self.textmarks = []  # Collections for floating texts
+        # Enemies are spawned when the camera comes near (see spawn_enemies),
+        # unless LAZY_SPAWNING is False.
+        self.enemies = DeferredList()
+        self.enemy_system = (
+            EnemySystem(self) if ENEMY_SYSTEM and np is not None else None
+        )
+        self.enemy_spawners = level["enemy_spawners"]  # sorted by x
+        self.enemy_spawner_xs = level["enemy_spawner_xs"]
+        # Indices of the enemy spawners used in this attempt.
+        # Killed enemies are not spawned again until the next attempt.
+        self.spawned = set()
+        if not LAZY_SPAWNING:
+            for i in range(len(self.enemy_spawners)):
+                self.spawn_enemy(i)
+
+        # Checkpoint positions
+        self.checkpoints = list(level["checkpoints"])
+        # Objects of the last attempt go back to the pools
+        self.pools["projectile"].release_all(self.projectiles)
+        for particles in (self.fireballs, self.particles):
+            self.pools["particle"].release_all(particles)
+        self.pools["textmark"].release_all(self.textmarks)
+        self.projectiles = DeferredList()  # Collections for projectiles
+        self.fireballs = DeferredList()  # Collections for fireballs
+        self.fireswings = DeferredList()  # Collections for fireswings
+        self.collision.clear_areas()  # Fireswings are registered there
+        self.particles = DeferredList()  # Collections for particles
+        self.sparks.clear()  # Collections for sparks
+        self.textmarks = DeferredList()  # Collections for floating texts
         self.scroll = [0, 0]  # Initial position of camera
         self.dead = 0  # Is player died?
         self.transition = -30  # For level transitioning effect
@@ -246,4 +339,4 @@ class Game:
             False  # To be converted to True when player hits the finishline tile
         )
         # Finishline tiles (variant 0 is the top left corner tile of the finishline sigh)
-        self.finishline_tiles = self.tilemap.extract([("finishline", 0)], keep=True)
+        self.finishline_tiles = list(level["finishline_tiles"])
@@ -0,0 +1,172 @@
+# leaffield.py - LeafField class, and LeafList class as its fallback
+#
+# @author      : Chiho Kim (chiho80@gmail.com)
+# @file        : leaffield.py
+# @created     : Monday Oct 19, 2026 01:10 PT
+#
+# Copyright (c) 2026 Chiho Kim. All rights reserved.
+
+import math
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional. Without it, leaves are Particle objects (see LeafList).
+    np = None
+
+from scripts.deferredlist import DeferredList
+from scripts.utils import blit_all
+
+# A spawner (rect) spawns a leaf with the probability of (rect area / this) per frame
+LEAF_SPAWN_AREA = 49999
+# Velocity of falling leaves (pixels per frame)
+LEAF_VELOCITY = (-0.1, 0.3)
+
+
+class LeafField:
+    """All the falling leaves in NumPy arrays (one row per leaf). Leaves are spawned
+    in the spawner rects (trees), fall and sway back and forth in x until their
+    animation ends, as the leaf Particles did. Each spawner has the time (frame)
+    of its next leaf, drawn from the geometric distribution, instead of rolling
+    a random number for every spawner at every frame. Only the leaves on the
+    surface are drawn, in one blit call.
+    """
+
+    def __init__(self, clip, capacity=128):
+        self.clip = clip
+        self.rng = np.random.default_rng(random.getrandbits(32))
+        self.count = 0
+        self.pos = np.zeros((capacity, 2))
+        self.frame = np.zeros(capacity, dtype=np.int32)  # frame of the animation
+        self.killed = np.zeros(capacity, dtype=bool)  # to be removed at next update
+        self.set_spawners(())
+
+    def set_spawners(self, rects):
+        """Start over with the spawners (rects)"""
+        self.count = 0
+        self.time = 0  # frames
+        self.spawners = np.array([tuple(rect) for rect in rects], dtype=float)
+        self.spawners.shape = (len(rects), 4)  # x, y, w, h
+        # Probability of a spawn per frame for each spawner
+        self.spawn_prob = np.minimum(
+            self.spawners[:, 2] * self.spawners[:, 3] / LEAF_SPAWN_AREA, 1
+        )
+        self.next_spawn = self.rng.geometric(self.spawn_prob)
+
+    def clear(self):
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def update(self):
+        n = self.count
+        if n:
+            # Remove the ones killed in the last frame, keeping the order
+            alive = ~self.killed[:n]
+            if not alive.all():
+                n = int(alive.sum())
+                self.pos[:n] = self.pos[: self.count][alive]
+                self.frame[:n] = self.frame[: self.count][alive]
+                self.count = n
+            # Sway of the last frame, after it was rendered
+            self.pos[:n, 0] += np.sin(self.frame[:n] * 0.035) * 0.3
+
+        # Spawn the leaves due
+        self.time += 1
+        due = np.flatnonzero(self.next_spawn <= self.time)
+        if len(due):
+            self.next_spawn[due] = self.time + self.rng.geometric(self.spawn_prob[due])
+            self.spawn(self.spawners[due])
+            n = self.count
+
+        # Kill the ones whose animation ended in the last frame.
+        # They are still rendered in this frame.
+        last = self.clip.length - 1
+        frame = self.frame[:n]
+        self.killed[:n] = frame >= last
+        self.pos[:n] += LEAF_VELOCITY
+        np.minimum(frame + 1, last, out=frame)
+
+    def spawn(self, rects):
+        """Spawn a leaf at a random position in each of rects"""
+        n = self.count
+        end = n + len(rects)
+        if end > len(self.frame):
+            capacity = max(end, 2 * len(self.frame))
+            self.pos = np.resize(self.pos, (capacity, 2))
+            self.frame = np.resize(self.frame, capacity)
+            self.killed = np.resize(self.killed, capacity)
+        self.pos[n:end] = rects[:, :2] + self.rng.random((len(rects), 2)) * rects[:, 2:]
+        self.frame[n:end] = self.rng.integers(0, 4, len(rects))
+        self.count = end
+
+    def render(self, surf, offset=(0, 0)):
+        n = self.count
+        if not n:
+            return
+        frames = self.clip.frames[(False, False)]
+        # All the leaf images are the same size
+        img_w, img_h = frames[0][0].get_size()
+        corner = (self.pos[:n] - offset - (img_w // 2, img_h // 2)).astype(np.int32)
+        on_surf = ((corner < surf.get_size()) & (corner + (img_w, img_h) > 0)).all(
+            axis=1
+        )
+        blit_all(
+            surf,
+            [
+                (frames[frame][0], (x, y))
+                for frame, x, y in zip(
+                    self.frame[:n][on_surf].tolist(),
+                    corner[on_surf, 0].tolist(),
+                    corner[on_surf, 1].tolist(),
+                )
+            ],
+        )
+
+
+class LeafList(DeferredList):
+    """Same as LeafField, with leaf Particles from the pool, for no NumPy"""
+
+    def __init__(self, game):
+        super().__init__()
+        self.game = game
+        self.spawners = ()
+
+    def set_spawners(self, rects):
+        self.clear()
+        self.spawners = tuple(rects)
+
+    def clear(self):
+        self.game.pools["particle"].release_all(self)
+        super().clear()
+        self.removed = set()
+
+    def update(self):
+        self.compact(self.game.pools["particle"].release)
+        for leaf in self:
+            # Sway of the last frame, after it was rendered
+            leaf.pos[0] += math.sin(leaf.animation.frame * 0.035) * 0.3
+        for rect in self.spawners:
+            if random.random() * LEAF_SPAWN_AREA < rect.width * rect.height:
+                pos = (
+                    rect.x + random.random() * rect.width,
+                    rect.y + random.random() * rect.height,
+                )
+                self.append(
+                    self.game.pools["particle"].acquire(
+                        self.game,
+                        "leaf",
+                        pos,
+                        velocity=LEAF_VELOCITY,
+                        frame=random.randint(0, 3),
+                    )
+                )
+        for leaf in self:
+            if leaf.update():
+                self.discard(leaf)
+
+    def render(self, surf, offset=(0, 0)):
+        for leaf in self:
+            leaf.render(surf, offset=offset)
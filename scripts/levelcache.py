@@ -0,0 +1,126 @@
+# levelcache.py - LevelCache class
+#
+# @author      : Chiho Kim (chiho80@gmail.com)
+# @file        : levelcache.py
+# @created     : Sunday Oct 18, 2026 15:20 PT
+#
+# Copyright (c) 2026 Chiho Kim. All rights reserved.
+
+import pygame
+from types import MappingProxyType
+from scripts.tilemap import Tilemap
+from scripts.constants import LEVELS, VISUAL_EFFECT
+
+# Number of parsed levels to keep. The least recently used one is dropped first.
+LEVEL_CACHE_SIZE = 3
+
+
+class LevelCache:
+    """Keep the parsed levels keyed by map id, so that respawning after death or
+    switching between levels does not read the map file and run extract passes again.
+    Each cached level is immutable. Game.load_level starts every attempt from
+    a copy-on-write view of it (Tilemap.restore)."""
+
+    def __init__(self, game):
+        self.game = game
+        self.levels = {}  # map id -> parsed level, the most recently used last
+
+    def get(self, map_id):
+        """Return the parsed level for map_id. Parse it if it's not cached yet."""
+        level = self.levels.pop(map_id, None)
+        if level is None:
+            level = self.parse(map_id)
+        self.levels[map_id] = level
+        while len(self.levels) > LEVEL_CACHE_SIZE:
+            del self.levels[next(iter(self.levels))]
+        return level
+
+    def clear(self):
+        self.levels = {}
+
+    def parse(self, map_id):
+        """Load the level map and collect all the spawners from it"""
+        tilemap = Tilemap(self.game, tile_size=16)
+        try:
+            tilemap.load(LEVELS[str(map_id)]["map"])
+        except:
+            # TODO can do this better
+            tilemap.load(LEVELS["1"]["map"])
+
+        # Pull all the spawners out of the map in one pass
+        trees, fireholes, fireswings, spawners, checkpoint_tiles, finishline_tiles = (
+            tilemap.extract_many(
+                [
+                    ([("decor/tree", 1)] if VISUAL_EFFECT["leaf"] else [], True),
+                    ([("decor/firehole", 0)], True),
+                    ([("decor/fireswing", 0)], True),
+                    (
+                        [
+                            ("spawners", 0),
+                            ("spawners", 1),
+                            ("spawners", 2),
+                            ("spawners", 3),
+                        ],
+                        False,
+                    ),
+                    ([("checkpoint", 0)], False),
+                    # Finishline tiles (variant 0 is the top left corner tile of the finishline sigh)
+                    ([("finishline", 0)], True),
+                ]
+            )
+        )
+
+        # Collect leaf spawners (trees)
+        leaf_spawners = []
+        for tree in trees:
+            leaf_spawners.append(
+                pygame.Rect(4 + tree["pos"][0], 4 + tree["pos"][1], 23, 13)
+            )
+
+        # Collect fireball spawners
+        fireball_spawners = []
+        for firehole in fireholes:
+            fireball_spawners.append(
+                pygame.Rect(firehole["pos"][0], firehole["pos"][1], 16, 16)
+            )
+
+        # Collect fireswing spawners
+        fireswing_spawners = []
+        for fireswing in fireswings:
+            fireswing_spawners.append(
+                pygame.Rect(fireswing["pos"][0], fireswing["pos"][1], 16, 16)
+            )
+
+        # Collect checkpoint positions
+        checkpoints = []
+        for checkpoint in checkpoint_tiles:
+            if checkpoint["variant"] == 0:
+                # We need only one variant (value = 0), and we only have that in the tile maps.
+                # I left this if clause for later change, which is not likely happening though...
+                checkpoints.append(tuple(checkpoint["pos"]))
+
+        # Enemy spawners sorted by x, to find the ones near the camera quickly
+        enemy_spawners = sorted(
+            (spawner for spawner in spawners if spawner["variant"] != 0),
+            key=lambda spawner: spawner["pos"][0],
+        )
+
+        return MappingProxyType(
+            {
+                "tilemap": tilemap.snapshot(),
+                "leaf_spawners": tuple(leaf_spawners),
+                "fireball_spawners": tuple(fireball_spawners),
+                "fireswing_spawners": tuple(fireswing_spawners),
+                "spawners": tuple(MappingProxyType(spawner) for spawner in spawners),
+                "enemy_spawners": tuple(
+                    MappingProxyType(spawner) for spawner in enemy_spawners
+                ),
+                "enemy_spawner_xs": tuple(
+                    spawner["pos"][0] for spawner in enemy_spawners
+                ),
+                "checkpoints": tuple(checkpoints),
+                "finishline_tiles": tuple(
+                    MappingProxyType(tile) for tile in finishline_tiles
+                ),
+            }
+        )
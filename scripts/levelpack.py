@@ -0,0 +1,207 @@
+# levelpack.py - Read & write maps, including the compact binary level format
+#
+# @author      : Chiho Kim (chiho80@gmail.com)
+# @file        : levelpack.py
+# @created     : Sunday Oct 18, 2026 13:40 PT
+#
+# Copyright (c) 2026 Chiho Kim. All rights reserved.
+
+import os
+import sys
+import json
+import mmap
+import array
+import struct
+import zlib
+
+# File extension of the binary level files. data/maps/1.json is packed into data/maps/1.blvl
+LEVEL_PACK_EXT = ".blvl"
+
+# Layout of the binary level file (little endian)
+#   header  : magic, version, tile_size, crc32 of the source json, number of types,
+#             number of ongrid tiles, number of offgrid tiles
+#   types   : (length, utf-8 name) for each tile type, padded to 8 bytes
+#   ongrid  : x (int32[]), y (int32[]), type id (uint16[]), variant (uint16[])
+#   offgrid : x (float64[]), y (float64[]), type id (uint16[]), variant (uint16[])
+# Arrays are padded to 8 bytes so that each one can be cast in place.
+LEVEL_PACK_MAGIC = b"BLVL"
+LEVEL_PACK_VERSION = 1
+LEVEL_PACK_HEADER = struct.Struct("<4sHHIHII")
+
+
+def packed_path(path):
+    """Path of the binary level file for the json map file at path"""
+    return os.path.splitext(path)[0] + LEVEL_PACK_EXT
+
+
+def padding(size):
+    return -size % 8
+
+
+def read_json_map(path):
+    """Read the json map file. Return the map data with (x, y) keys for the tilemap"""
+    f = open(path, "r")
+    map_data = json.load(f)
+    f.close()
+    # Convert "x;y" string keys into (x, y) integer tuples only once here,
+    # so that the lookups in every frame do not need to format strings.
+    tilemap = {}
+    for loc, tile in map_data["tilemap"].items():
+        x, y = loc.split(";")
+        tilemap[(int(x), int(y))] = tile
+    map_data["tilemap"] = tilemap
+    return map_data
+
+
+def write_packed_map(path, map_data, source_crc):
+    """Write map data (as returned by read_json_map) into the binary level file"""
+    types = sorted(
+        {tile["type"] for tile in map_data["tilemap"].values()}
+        | {tile["type"] for tile in map_data["offgrid"]}
+    )
+    type_ids = {tile_type: i for i, tile_type in enumerate(types)}
+    tiles = list(map_data["tilemap"].values())
+    offgrid = map_data["offgrid"]
+
+    blocks = [
+        LEVEL_PACK_HEADER.pack(
+            LEVEL_PACK_MAGIC,
+            LEVEL_PACK_VERSION,
+            map_data["tile_size"],
+            source_crc,
+            len(types),
+            len(tiles),
+            len(offgrid),
+        )
+    ]
+    type_table = b""
+    for tile_type in types:
+        name = tile_type.encode("utf-8")
+        type_table += struct.pack("<B", len(name)) + name
+    blocks.append(type_table + bytes(padding(LEVEL_PACK_HEADER.size + len(type_table))))
+
+    columns = [
+        array.array("i", [tile["pos"][0] for tile in tiles]),
+        array.array("i", [tile["pos"][1] for tile in tiles]),
+        array.array("H", [type_ids[tile["type"]] for tile in tiles]),
+        array.array("H", [tile["variant"] for tile in tiles]),
+        array.array("d", [tile["pos"][0] for tile in offgrid]),
+        array.array("d", [tile["pos"][1] for tile in offgrid]),
+        array.array("H", [type_ids[tile["type"]] for tile in offgrid]),
+        array.array("H", [tile["variant"] for tile in offgrid]),
+    ]
+    for column in columns:
+        if sys.byteorder == "big":
+            column.byteswap()
+        data = column.tobytes()
+        blocks.append(data + bytes(padding(len(data))))
+
+    # Write into a temporary file first, then replace the file at once,
+    # so that an interrupted write never leaves a partly written level file.
+    temp_path = path + ".tmp"
+    f = open(temp_path, "wb")
+    f.write(b"".join(blocks))
+    f.close()
+    os.replace(temp_path, path)
+
+
+def read_packed_map(path, source_crc):
+    """Memory-map the binary level file and return the map data,
+    or None if the file is missing, broken or was not built from the current json."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    try:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        # Empty file
+        f.close()
+        return None
+
+    view = memoryview(buffer)
+    columns = []
+    try:
+        magic, version, tile_size, crc, n_types, n_tiles, n_offgrid = (
+            LEVEL_PACK_HEADER.unpack_from(buffer, 0)
+        )
+        if (
+            magic != LEVEL_PACK_MAGIC
+            or version != LEVEL_PACK_VERSION
+            or crc != source_crc
+        ):
+            return None
+
+        offset = LEVEL_PACK_HEADER.size
+        types = []
+        for _ in range(n_types):
+            length = buffer[offset]
+            types.append(bytes(view[offset + 1 : offset + 1 + length]).decode("utf-8"))
+            offset += 1 + length
+        offset += padding(offset)
+
+        def column(typecode, count):
+            nonlocal offset
+            size = array.array(typecode).itemsize * count
+            if offset + size > len(buffer):
+                raise ValueError("Truncated level file")
+            if sys.byteorder == "little":
+                # Cast the mapped bytes in place without copying
+                values = view[offset : offset + size].cast(typecode)
+            else:
+                values = array.array(typecode)
+                values.frombytes(view[offset : offset + size])
+                values.byteswap()
+            offset += size + padding(size)
+            columns.append(values)
+            return values
+
+        tile_x, tile_y = column("i", n_tiles), column("i", n_tiles)
+        tile_type, tile_variant = column("H", n_tiles), column("H", n_tiles)
+        offgrid_x, offgrid_y = column("d", n_offgrid), column("d", n_offgrid)
+        offgrid_type, offgrid_variant = column("H", n_offgrid), column("H", n_offgrid)
+        if offset != len(buffer):
+            return None
+
+        tilemap = {}
+        for x, y, t, v in zip(tile_x, tile_y, tile_type, tile_variant):
+            tilemap[(x, y)] = {"type": types[t], "variant": v, "pos": [x, y]}
+        offgrid = [
+            {"type": types[t], "variant": v, "pos": [x, y]}
+            for x, y, t, v in zip(offgrid_x, offgrid_y, offgrid_type, offgrid_variant)
+        ]
+    except (struct.error, TypeError, ValueError, IndexError):
+        # Partly written or broken file. The json will be read instead.
+        return None
+    finally:
+        # Release the casted views before closing the map
+        for values in columns:
+            if isinstance(values, memoryview):
+                values.release()
+        view.release()
+        buffer.close()
+        f.close()
+
+    return {"tilemap": tilemap, "tile_size": tile_size, "offgrid": offgrid}
+
+
+def file_crc(path):
+    f = open(path, "rb")
+    crc = zlib.crc32(f.read())
+    f.close()
+    return crc
+
+
+def read_map(path, use_packed=True):
+    """Read the map at path. If the binary level file built from
+    this json exists next to it, it is used instead of parsing the json."""
+    if use_packed and path.endswith(".json"):
+        map_data = read_packed_map(packed_path(path), file_crc(path))
+        if map_data:
+            return map_data
+    return read_json_map(path)
+
+
+def pack_map(path):
+    """Build the binary level file from the json map file at path"""
+    write_packed_map(packed_path(path), read_json_map(path), file_crc(path))
@@ -1,4 +1,4 @@
-# particle.py - Particle class (fireball, fireswing, projectile, leaf)
+# particle.py - Particle class (fireball, boostgas, leaf)
 #
 # @author      : Chiho Kim (chiho80@gmail.com)
 # @file        : particle.py
@@ -6,34 +6,47 @@
 #
 # Copyright (c) 2024 Chiho Kim. All rights reserved.
 
-import math
-
 
 class Particle:
-    def __init__(
+    __slots__ = (
+        "game",
+        "type",
+        "pos",
+        "initial_pos",
+        "velocity",
+        "animation",
+        "freefalling",
+        "xflip",
+        "yflip",
+    )
+
+    def __init__(self, game, p_type, pos, **kwargs):
+        self.pos = [0, 0]
+        self.initial_pos = [0, 0]
+        self.velocity = [0, 0]
+        self.animation = None
+        self.reset(game, p_type, pos, **kwargs)
+
+    def reset(
         self,
         game,
         p_type,
         pos,
-        velocity=[0, 0],
-        angular_motion_velocity=None,
-        angular_motion_offset=0,
-        angular_motion_center=None,
-        angular_motion_initial_theta=0,
+        velocity=(0, 0),
         frame=0,
         freefalling=False,
     ):
+        """Start over in place, when reused from the pool (see Pool)"""
         self.game = game
         self.type = p_type
-        self.pos = list(pos)
-        self.initial_pos = list(pos)
-        self.velocity = list(velocity)
-        self.angular_motion_velocity = angular_motion_velocity
-        self.angular_motion_offset = angular_motion_offset
-        self.angular_motion_center = angular_motion_center
-        self.angular_motion_theta = angular_motion_initial_theta
-        self.animation = self.game.assets["particle/" + p_type].copy()
-        self.animation.frame = frame
+        self.pos[0], self.pos[1] = pos[0], pos[1]
+        self.initial_pos[0], self.initial_pos[1] = pos[0], pos[1]
+        self.velocity[0], self.velocity[1] = velocity[0], velocity[1]
+        clip = game.assets["particle/" + p_type]
+        if self.animation is None:
+            self.animation = clip.play(frame)
+        else:
+            self.animation.reset(clip, frame)
         self.freefalling = freefalling
         self.xflip = False
         self.yflip = False
@@ -44,41 +57,22 @@ class Particle:
         if self.animation.done:
             kill = True
 
-        # If angular_motion_velocity is not None, this particle is in circular motion
-        if self.angular_motion_velocity:
-            # Update position of the particle
-            self.angular_motion_theta += self.angular_motion_velocity
-            if self.angular_motion_theta > 2:
-                self.angular_motion_theta = 0
-            self.pos[0] = (
-                self.angular_motion_center[0]
-                + math.cos(math.pi * self.angular_motion_theta)
-                * self.angular_motion_offset
-            )
-            self.pos[1] = (
-                self.angular_motion_center[1]
-                + math.sin(math.pi * self.angular_motion_theta)
-                * self.angular_motion_offset
-            )
-            kill = False
-
-        else:
-            # Update position of the particle
-            self.pos[0] += self.velocity[0]
-            self.pos[1] += self.velocity[1]
+        # Update position of the particle
+        self.pos[0] += self.velocity[0]
+        self.pos[1] += self.velocity[1]
 
-            # Update y velociry if freefalling is True
-            # Currently, only the fireball is freefalling
-            if self.freefalling:
-                self.velocity[1] += 0.1
+        # Update y velociry if freefalling is True
+        # Currently, only the fireball is freefalling
+        if self.freefalling:
+            self.velocity[1] += 0.1
 
-                # Flip y if it is falling
-                if self.velocity[1] > 0:
-                    self.yflip = True
+            # Flip y if it is falling
+            if self.velocity[1] > 0:
+                self.yflip = True
 
-                # Kill if y velocity is too large, or y position is lower than initial position
-                if self.velocity[1] > 10 or (self.pos[1] > self.initial_pos[1]):
-                    kill = True
+            # Kill if y velocity is too large, or y position is lower than initial position
+            if self.velocity[1] > 10 or (self.pos[1] > self.initial_pos[1]):
+                kill = True
 
         self.animation.update()
 
@@ -0,0 +1,43 @@
+# pool.py - Pool class
+#
+# @author      : Chiho Kim (chiho80@gmail.com)
+# @file        : pool.py
+# @created     : Sunday Oct 18, 2026 23:20 PT
+#
+# Copyright (c) 2026 Chiho Kim. All rights reserved.
+
+
+class Pool:
+    """Free list of short-lived objects (sparks, particles, textmarks, projectiles).
+    acquire() reuses a released object, resetting it in place with obj.reset(...),
+    which takes the same arguments as the constructor. A new object is created
+    only when the free list is empty. Objects must not be used after release().
+    high_water is the largest number of objects in use at once, to size the pool.
+    """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.free = []
+        self.in_use = 0
+        self.high_water = 0
+        self.created = 0
+
+    def acquire(self, *args, **kwargs):
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args, **kwargs)
+        else:
+            obj = self.cls(*args, **kwargs)
+            self.created += 1
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        return obj
+
+    def release(self, obj):
+        self.in_use -= 1
+        self.free.append(obj)
+
+    def release_all(self, objs):
+        for obj in objs:
+            self.release(obj)
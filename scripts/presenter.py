@@ -0,0 +1,124 @@
+# presenter.py - Presenter class
+#
+# @author      : Chiho Kim (chiho80@gmail.com)
+# @file        : presenter.py
+# @created     : Monday Oct 19, 2026 03:40 PT
+#
+# Copyright (c) 2026 Chiho Kim. All rights reserved.
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional. Without it, every frame is presented in full.
+    np = None
+
+# Size (pixels of the display) of the tiles the dirty regions are made of
+DIRTY_TILE = 16
+
+
+class Presenter:
+    """Scale the display up to the window and push it to the screen.
+    In gameplay the whole window is redrawn every frame. On the static screens
+    (intro, pause, game over, finale) only a few regions change in a frame:
+    the blinking text, a scrolling background layer, falling leaves. There,
+    the display is compared with the frame presented last, tile by tile,
+    and only the tiles changed are scaled and pushed with display.update(rects).
+    This is done at an integer scale only, where scaling a part of the display
+    gives the same pixels as that part of the display scaled as a whole.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.display_size_id = None  # window size presented last
+        self.last = None  # pixels of the display presented last (static screens)
+        self.last_frame = {"dirty_rects": 0, "dirty_area": 0}
+
+    def invalidate(self):
+        """Present the next frame in full (e.g. the window needs to be redrawn)"""
+        self.last = None
+
+    def scale(self):
+        """Integer scale from the display to the window, or 0 if not an integer"""
+        width, height = self.game.display.get_size()
+        window_width, window_height = self.game.display_sizes[self.game.display_size_id]
+        scale = int(window_width) // int(width)
+        if scale and (window_width, window_height) == (scale * width, scale * height):
+            return scale
+        return 0
+
+    def present(self, offset=(0, 0), static=False):
+        """Draw the display onto the screen at offset (screenshake), and update
+        the window. If static, push only the regions changed since the last frame."""
+        game = self.game
+        scale = self.scale()
+        if (
+            not static
+            or np is None
+            or offset[0]
+            or offset[1]
+            or not scale
+            or game.display_size_id != self.display_size_id
+            or self.last is None
+        ):
+            game.screen.blit(
+                pygame.transform.scale(
+                    game.display, game.display_sizes[game.display_size_id]
+                ),
+                offset,
+            )
+            pygame.display.update()
+            self.display_size_id = game.display_size_id
+            self.last = None
+            if static and np is not None and not (offset[0] or offset[1]):
+                # Same dtype (uint32) as the pixels compared at the next frame
+                self.last = pygame.surfarray.pixels2d(game.display).copy()
+            self.last_frame = {
+                "dirty_rects": 1,
+                "dirty_area": game.display.get_width() * game.display.get_height(),
+            }
+            return
+
+        rects = self.dirty_rects()
+        window_rects = []
+        for rect in rects:
+            window_rect = pygame.Rect(
+                rect.x * scale, rect.y * scale, rect.w * scale, rect.h * scale
+            )
+            game.screen.blit(
+                pygame.transform.scale(game.display.subsurface(rect), window_rect.size),
+                window_rect,
+            )
+            window_rects.append(window_rect)
+        if window_rects:
+            pygame.display.update(window_rects)
+        self.last_frame = {
+            "dirty_rects": len(rects),
+            "dirty_area": sum(rect.w * rect.h for rect in rects),
+        }
+
+    def dirty_rects(self):
+        """Rects (display) of the tiles changed since the last frame, merged into
+        runs along the rows of the tiles. The last frame is updated to this one."""
+        pixels = pygame.surfarray.pixels2d(self.game.display)
+        changed = pixels != self.last
+        self.last[...] = pixels
+        del pixels  # Unlock the display
+        width, height = changed.shape
+        changed = np.logical_or.reduceat(changed, range(0, width, DIRTY_TILE), axis=0)
+        changed = np.logical_or.reduceat(changed, range(0, height, DIRTY_TILE), axis=1)
+
+        rects = []
+        for j, row in enumerate(changed.T.tolist()):
+            y = j * DIRTY_TILE
+            h = min(DIRTY_TILE, height - y)
+            start = None
+            for i, dirty in enumerate(row + [False]):
+                if dirty and start is None:
+                    start = i
+                elif not dirty and start is not None:
+                    x = start * DIRTY_TILE
+                    rects.append(pygame.Rect(x, y, min(i * DIRTY_TILE, width) - x, h))
+                    start = None
+        return rects
@@ -0,0 +1,24 @@
+# projectile.py - Projectile class
+#
+# @author      : Chiho Kim (chiho80@gmail.com)
+# @file        : projectile.py
+# @created     : Sunday Oct 18, 2026 23:20 PT
+#
+# Copyright (c) 2026 Chiho Kim. All rights reserved.
+
+
+class Projectile:
+    """Projectile shot by an enemy. It flies straight along x by direction
+    (pixels per frame, negative to the left). timer counts the frames it flew."""
+
+    __slots__ = ("pos", "direction", "timer")
+
+    def __init__(self, pos, direction):
+        self.pos = [0, 0]
+        self.reset(pos, direction)
+
+    def reset(self, pos, direction):
+        """Start over in place, when reused from the pool (see Pool)"""
+        self.pos[0], self.pos[1] = pos[0], pos[1]
+        self.direction = direction
+        self.timer = 0
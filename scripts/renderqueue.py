@@ -0,0 +1,78 @@
+# renderqueue.py - RenderQueue class
+#
+# @author      : Chiho Kim (chiho80@gmail.com)
+# @file        : renderqueue.py
+# @created     : Monday Oct 19, 2026 02:50 PT
+#
+# Copyright (c) 2026 Chiho Kim. All rights reserved.
+
+from scripts.utils import blit_all
+
+# Layers, drawn from the bottom to the top
+LAYERS = ("cloud", "tile", "entity", "projectile", "effect")
+
+
+class RenderLayer:
+    """One layer of RenderQueue. It takes blit() and blits() as a surface does,
+    so it can be passed to render(surf, offset) of anything drawing by blits.
+    They are only collected here, and drawn when the queue is flushed."""
+
+    def __init__(self, surf):
+        self.surf = surf
+        self.blit_sequence = []
+
+    def get_width(self):
+        return self.surf.get_width()
+
+    def get_height(self):
+        return self.surf.get_height()
+
+    def get_size(self):
+        return self.surf.get_size()
+
+    def blit(self, img, pos):
+        self.blit_sequence.append((img, pos))
+
+    def blits(self, blit_sequence, doreturn=True):
+        self.blit_sequence.extend(blit_sequence)
+
+
+class RenderQueue:
+    """Blits of a frame collected by layer, then drawn onto surf at flush()
+    with one blits (or fblits) call per layer, in the order of LAYERS.
+    Blits within a layer keep the order they were added.
+    Counters tell how many blits and draw calls were made per frame.
+    """
+
+    def __init__(self, surf):
+        self.surf = surf
+        self.layers = {layer: RenderLayer(surf) for layer in LAYERS}
+        # Counters of this frame
+        self.blit_count = 0
+        self.draw_calls = 0
+        # Counters of the last frame finished
+        self.last_frame = {"blit_count": 0, "draw_calls": 0}
+
+    def layer(self, name):
+        return self.layers[name]
+
+    def new_frame(self):
+        """Keep the counters of the frame just finished, and start a new frame"""
+        self.last_frame = {
+            "blit_count": self.blit_count,
+            "draw_calls": self.draw_calls,
+        }
+        self.blit_count = 0
+        self.draw_calls = 0
+        for layer in self.layers.values():
+            layer.blit_sequence = []
+
+    def flush(self):
+        """Draw all the blits collected so far"""
+        for name in LAYERS:
+            blit_sequence = self.layers[name].blit_sequence
+            if blit_sequence:
+                blit_all(self.surf, blit_sequence)
+                self.blit_count += len(blit_sequence)
+                self.draw_calls += 1
+                self.layers[name].blit_sequence = []
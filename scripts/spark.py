@@ -12,11 +12,18 @@ import pygame
 
 
 class Spark:
+    __slots__ = ("pos", "angle", "speed", "size")
+
     def __init__(self, pos, angle, speed, size=(1, 3)):
-        self.pos = list(pos)
+        self.pos = [0, 0]
+        self.reset(pos, angle, speed, size)
+
+    def reset(self, pos, angle, speed, size=(1, 3)):
+        """Start over in place, when reused from the pool (see Pool)"""
+        self.pos[0], self.pos[1] = pos[0], pos[1]
         self.angle = angle
         self.speed = speed
-        self.size = list(size)
+        self.size = size
 
     def update(self):
         self.pos[0] += math.cos(self.angle) * self.speed
@@ -0,0 +1,162 @@
+# sparksystem.py - SparkSystem class, and SparkList class as its fallback
+#
+# @author      : Chiho Kim (chiho80@gmail.com)
+# @file        : sparksystem.py
+# @created     : Monday Oct 19, 2026 00:20 PT
+#
+# Copyright (c) 2026 Chiho Kim. All rights reserved.
+
+import math
+import random
+import pygame
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional. Without it, sparks are Spark objects (see SparkList).
+    np = None
+
+from scripts.deferredlist import DeferredList
+from scripts.utils import blit_all
+
+# Largest radius of the sparks
+MAX_SPARK_RADIUS = 8
+
+_circle_sprites = []
+
+
+def circle_sprites():
+    """White circles of radius 0 ... MAX_SPARK_RADIUS, rendered only once.
+    Blitting sprites[r] at (floor(x) - r, floor(y) - r) gives the same pixels
+    as pygame.draw.circle at (x, y) with radius r."""
+    if not _circle_sprites:
+        for r in range(MAX_SPARK_RADIUS + 1):
+            # Colorkey blits faster than per-pixel alpha
+            sprite = pygame.Surface((2 * r + 1, 2 * r + 1))
+            pygame.draw.circle(sprite, (255, 255, 255), (r, r), r)
+            sprite.set_colorkey((0, 0, 0))
+            _circle_sprites.append(sprite)
+    return _circle_sprites
+
+
+class SparkSystem:
+    """All the sparks in NumPy arrays (one row per spark). They move, slow down
+    and die (speed reaches 0) all at once in a few vectorized steps, as Spark does
+    one by one. Dead sparks are rendered in their last frame, then removed at the
+    next update. Only the ones on the surface are drawn, from the cached
+    circle sprites in one blit call.
+    """
+
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.rng = np.random.default_rng(random.getrandbits(32))
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        """(Re)allocate the arrays, keeping the sparks alive"""
+        n = self.count
+        arrays = {
+            "pos": np.zeros((capacity, 2)),
+            "angle": np.zeros(capacity),
+            "speed": np.zeros(capacity),
+            "size": np.zeros((capacity, 2), dtype=np.int32),  # radius (min, max)
+        }
+        for name, array in arrays.items():
+            if n:
+                array[:n] = getattr(self, name)[:n]
+            setattr(self, name, array)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, pos, angle, speed, size=(1, 3)):
+        """Spawn a spark. Arguments are the same as Spark."""
+        i = self.count
+        if i == len(self.speed):
+            self.allocate(2 * len(self.speed))
+        self.pos[i] = pos[0], pos[1]
+        self.angle[i] = angle
+        self.speed[i] = speed
+        self.size[i] = size
+        self.count += 1
+
+    def clear(self):
+        self.count = 0
+
+    def update(self):
+        n = self.count
+        if not n:
+            return
+        # Remove the ones died in the last frame, keeping the order
+        alive = self.speed[:n] > 0
+        if not alive.all():
+            n = int(alive.sum())
+            for array in (self.pos, self.angle, self.speed, self.size):
+                array[:n] = array[: self.count][alive]
+            self.count = n
+        speed = self.speed[:n]
+        angle = self.angle[:n]
+        self.pos[:n, 0] += np.cos(angle) * speed
+        self.pos[:n, 1] += np.sin(angle) * speed
+        np.maximum(speed - 0.1, 0, out=speed)
+
+    def render(self, surf, offset=(0, 0)):
+        n = self.count
+        if not n:
+            return
+        # Random radius in the size range, as random.randint(size[0], size[1])
+        size_min = self.size[:n, 0]
+        span = self.size[:n, 1] - size_min + 1
+        radius = size_min + (self.rng.random(n) * span).astype(np.int32)
+        corner = np.floor(self.pos[:n] - offset).astype(np.int32) - radius[:, None]
+        # Cull the ones off the surface
+        on_surf = (
+            (corner < surf.get_size()) & (corner + 2 * radius[:, None] >= 0)
+        ).all(axis=1)
+        sprites = circle_sprites()
+        blit_all(
+            surf,
+            [
+                (sprites[r], (x, y))
+                for r, x, y in zip(
+                    radius[on_surf].tolist(),
+                    corner[on_surf, 0].tolist(),
+                    corner[on_surf, 1].tolist(),
+                )
+            ],
+        )
+
+
+class SparkList(DeferredList):
+    """Same as SparkSystem, with Spark objects from the pool, for no NumPy"""
+
+    def __init__(self, pool):
+        super().__init__()
+        self.pool = pool
+
+    def add(self, pos, angle, speed, size=(1, 3)):
+        self.append(self.pool.acquire(pos, angle, speed, size))
+
+    def clear(self):
+        self.pool.release_all(self)
+        super().clear()
+        self.removed = set()
+
+    def update(self):
+        # Remove the ones died in the last frame
+        self.compact(self.pool.release)
+        for spark in self:
+            if spark.update():
+                self.discard(spark)
+
+    def render(self, surf, offset=(0, 0)):
+        width, height = surf.get_size()
+        sprites = circle_sprites()
+        blit_sequence = []
+        for spark in self:
+            r = random.randint(spark.size[0], spark.size[1])
+            x = math.floor(spark.pos[0] - offset[0]) - r
+            y = math.floor(spark.pos[1] - offset[1]) - r
+            if x < width and y < height and x + 2 * r >= 0 and y + 2 * r >= 0:
+                blit_sequence.append((sprites[r], (x, y)))
+        blit_all(surf, blit_sequence)
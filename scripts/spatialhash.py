@@ -0,0 +1,91 @@
+# spatialhash.py - SpatialHash class
+#
+# @author      : Chiho Kim (chiho80@gmail.com)
+# @file        : spatialhash.py
+# @created     : Sunday Oct 18, 2026 22:30 PT
+#
+# Copyright (c) 2026 Chiho Kim. All rights reserved.
+
+# Size (pixels) of the cells of the grid
+CELL_SIZE = 64
+
+
+class SpatialHash:
+    """Uniform grid for the dynamic objects (enemies, projectiles, fireballs ...).
+    Objects are registered with their kind and bounding rect (x, y, w, h) into every
+    cell the rect covers. Queries look at the cells around the area only, so the cost
+    does not grow with the number of objects far from it.
+    It is cleared and filled again every frame, as the objects move.
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (kind, cx, cy) -> [index of entries, ...]
+        self.entries = []  # (obj, x, y, w, h) in the order registered
+
+    def clear(self):
+        self.cells = {}
+        self.entries = []
+
+    def cell_range(self, x, y, w, h):
+        return (
+            range(int(x // self.cell_size), int((x + w) // self.cell_size) + 1),
+            range(int(y // self.cell_size), int((y + h) // self.cell_size) + 1),
+        )
+
+    def insert(self, kind, obj, x, y, w=0, h=0):
+        """Register obj of kind with its bounding rect. w, h = 0 for a point."""
+        index = len(self.entries)
+        self.entries.append((obj, x, y, w, h))
+        cell_size = self.cell_size
+        # Cell indices may be floats (x // cell_size). They hash the same as ints.
+        key = (kind, x // cell_size, y // cell_size)
+        if key == (kind, (x + w) // cell_size, (y + h) // cell_size):
+            # Most of the objects are smaller than a cell, and fit in one
+            cell = self.cells.get(key)
+            if cell is None:
+                self.cells[key] = [index]
+            else:
+                cell.append(index)
+            return
+        cxs, cys = self.cell_range(x, y, w, h)
+        for cx in cxs:
+            for cy in cys:
+                cell = self.cells.get((kind, cx, cy))
+                if cell is None:
+                    self.cells[(kind, cx, cy)] = [index]
+                else:
+                    cell.append(index)
+
+    def query(self, kind, x, y, w=0, h=0):
+        """Return the entries (obj, x, y, w, h) of kind whose rects overlap
+        the rect (x, y, w, h), in the order registered. Touching edges count."""
+        cxs, cys = self.cell_range(x, y, w, h)
+        found = set()
+        for cx in cxs:
+            for cy in cys:
+                found.update(self.cells.get((kind, cx, cy), ()))
+        entries = []
+        for index in sorted(found):
+            entry = self.entries[index]
+            if (
+                entry[1] <= x + w
+                and x <= entry[1] + entry[3]
+                and entry[2] <= y + h
+                and y <= entry[2] + entry[4]
+            ):
+                entries.append(entry)
+        return entries
+
+    def near(self, kind, pos, radius):
+        """Return the entries of kind whose rects are within radius of pos"""
+        entries = []
+        for entry in self.query(
+            kind, pos[0] - radius, pos[1] - radius, 2 * radius, 2 * radius
+        ):
+            # Distance from pos to the nearest point of the rect
+            dx = max(entry[1] - pos[0], 0, pos[0] - entry[1] - entry[3])
+            dy = max(entry[2] - pos[1], 0, pos[1] - entry[2] - entry[4])
+            if dx * dx + dy * dy <= radius * radius:
+                entries.append(entry)
+        return entries
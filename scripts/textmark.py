@@ -10,10 +10,17 @@ from scripts.utils import draw_text
 
 
 class TextMark:
+    __slots__ = ("text", "font", "pos", "color", "border_col", "speed")
+
     def __init__(self, pos, text, font, color, border_col, speed):
+        self.pos = [0, 0]
+        self.reset(pos, text, font, color, border_col, speed)
+
+    def reset(self, pos, text, font, color, border_col, speed):
+        """Start over in place, when reused from the pool (see Pool)"""
         self.text = text
         self.font = font
-        self.pos = list(pos)
+        self.pos[0], self.pos[1] = pos[0], pos[1]
         self.color = color
         self.border_col = border_col
         self.speed = speed
@@ -6,9 +6,16 @@
 #
 # Copyright (c) 2024 Chiho Kim. All rights reserved.
 
+import os
 import pygame
 import json
 import math
+import array
+from types import MappingProxyType
+from scripts.chunk import ChunkRenderer
+from scripts.occupancy import OccupancyGrid, MIN_BATCH_POINTS, np
+from scripts.levelpack import read_map, pack_map, packed_path
+from scripts.utils import blit_all
 
 NEIGHBOR_OFFSETS = [
     (-1, -1),
@@ -53,45 +60,330 @@ MOVINGTILE_SPECS = {
 }
 
 
+def movingtile_offsets(spec):
+    """Offsets (dx, dy) of a moving tile group for every tick of a whole period,
+    2 values per tick. Tiles swing along sin (x) and cos (y) of pi * speed * tick.
+    """
+    periods = [round(2 / abs(speed)) if speed else 1 for speed in spec["initial_speed"]]
+    offsets = array.array("d")
+    for tick in range(math.lcm(*periods)):
+        offsets.append(
+            math.sin(math.pi * spec["initial_speed"][0] * tick) * spec["max_range"][0]
+        )
+        offsets.append(
+            math.cos(math.pi * spec["initial_speed"][1] * tick) * spec["max_range"][1]
+        )
+    return offsets
+
+
+# Moving tiles of the same spec move together. Each spec is a group.
+MOVINGTILE_GROUPS = {spec: group for group, spec in enumerate(MOVINGTILE_SPECS)}
+MOVINGTILE_OFFSETS = [movingtile_offsets(spec) for spec in MOVINGTILE_SPECS.values()]
+# Width (pixels) of the column buckets used to look up moving tiles around entities
+MOVINGTILE_BUCKET_WIDTH = 8 * 16
+# Width (pixels) of the column buckets used to look up offgrid tiles in the camera
+OFFGRID_BUCKET_WIDTH = 8 * 16
+
+
+class CollisionRect:
+    """Rect of a tile for collision checks, returned by Tilemap.rects_around.
+    They are made once and reused, so do not modify them.
+    rect_prev (rect in the previous frame) and dx are meaningful for moving tiles only,
+    which are updated in place whenever the tiles move."""
+
+    __slots__ = ("rect", "rect_prev", "dx")
+
+    def __init__(self, rect, rect_prev=None, dx=0):
+        self.rect = rect
+        self.rect_prev = rect_prev if rect_prev else rect
+        self.dx = dx
+
+
 class Tilemap:
     def __init__(self, game, tile_size=16):
         self.game = game
         self.tile_size = tile_size
-        self.tilemap = {}  # restricted by physics
+        self.tilemap = {}  # restricted by physics, keyed by (x, y) tile coordinates
         self.offgrid_tiles = []
-        self.transport = {}
+        # Registry of moving tiles. Moving tiles are not found by their grid location,
+        # so they are kept in column buckets covering their whole travel range.
+        # (x, y) -> rect covering every position the tile can reach
+        self.movingtiles = {}
+        self.movingtile_buckets = {}  # bucket index -> {(x, y): rect}
+        # Moving tiles are moved once per tick by update(), and both render and
+        # collision read the positions from here. Each moving tile has a slot,
+        # and the position of slot i is at [2 * i] (x) and [2 * i + 1] (y).
+        # None if the slots need to be packed again (see pack_movingtiles).
+        self.movingtile_locs = []  # slot -> (x, y)
+        self.movingtile_slots = {}  # (x, y) -> slot
+        self.movingtile_groups = array.array("H")  # slot -> group
+        self.movingtile_home = array.array("d")
+        self.movingtile_pos = array.array("d")
+        self.movingtile_pos_prev = array.array("d")
+        self.movingtile_rects = []  # slot -> CollisionRect
+        # Offsets of the groups in this tick
+        self.movingtile_offsets = array.array("d", [0] * 2 * len(MOVINGTILE_GROUPS))
+        self.movingtile_tick = 0
+        # Static ongrid tiles are rendered from baked chunks
+        self.chunks = ChunkRenderer(self)
+        # Index of offgrid tiles. offgrid_rects[i] is the image rect of offgrid_tiles[i],
+        # and each bucket keeps the indices of the tiles overlapping its column.
+        self.offgrid_rects = []
+        self.offgrid_buckets = {}  # bucket index -> [index of offgrid_tiles, ...]
+        # Index of tiles by (type, variant), so that extract() does not walk the whole map.
+        # (type, variant) -> {(x, y): order} for ongrid tiles,
+        # (type, variant) -> {id(tile): (order, tile)} for offgrid tiles.
+        # order keeps the tiles in the order they were loaded.
+        # None until it's needed (see extract_many).
+        self.ongrid_by_type = None
+        self.offgrid_by_type = None
+        self.type_order = 0
+        # Solidity of every cell to check many points at once. None without NumPy.
+        self.occupancy = None
+        # Bumped whenever solid ongrid tiles are added or removed, so that anything
+        # computed from the solid tiles (ex. patrol extents of enemies) knows it's stale.
+        self.solid_version = 0
+        # (x, y) -> CollisionRect of the tile. Static ones of a cached level are shared
+        # by all the attempts restored from it (shared_collision_rects). collision_rects
+        # keeps the ones owned by this attempt (moving tiles, and tiles added later).
+        self.collision_rects = {}
+        self.shared_collision_rects = {}
 
     def extract(self, id_pairs, keep=False):
         """Extract tiles with id_pairs to spawn something
         id_pairs: list of tile type & variant pairs
         keep = True if want to keep staying in the game,
         keep = False if wanted to remove after the incident
-        Use a shallow copy (~~.copy()) to avoid error
-        "dict changed during iteration" when keep is False.
         """
-        matches = []
-        for tile in self.offgrid_tiles.copy():
-            if (tile["type"], tile["variant"]) in id_pairs:
+        return self.extract_many([(id_pairs, keep)])[0]
+
+    def extract_many(self, requests):
+        """Extract several groups of tiles in one pass
+        requests: list of (id_pairs, keep), as the arguments of extract()
+        Return a list of the matches for each request.
+        Tiles are looked up in the (type, variant) index, so it costs O(matches)
+        instead of walking the whole map for every request.
+        Offgrid tiles first, then ongrid tiles, each in the order they were loaded.
+        """
+        if self.ongrid_by_type is None:
+            self.index_types()
+
+        results = []
+        removed_offgrid = set()
+        for id_pairs, keep in requests:
+            id_pairs = set(id_pairs)
+            matches = []
+
+            offgrid = []
+            for id_pair in id_pairs:
+                offgrid.extend(self.offgrid_by_type.get(id_pair, {}).values())
+            offgrid.sort(key=lambda entry: entry[0])
+            for _, tile in offgrid:
                 matches.append(tile.copy())
                 if not keep:
-                    self.offgrid_tiles.remove(tile)
+                    removed_offgrid.add(id(tile))
+                    self.unindex_type_offgrid(tile)
 
-        for loc in self.tilemap.copy():
-            tile = self.tilemap[loc]
-            if (tile["type"], tile["variant"]) in id_pairs:
+            ongrid = []
+            for id_pair in id_pairs:
+                ongrid.extend(self.ongrid_by_type.get(id_pair, {}).items())
+            ongrid.sort(key=lambda entry: entry[1])
+            for loc, _ in ongrid:
+                tile = self.tilemap[loc]
                 matches.append(tile.copy())
                 # Update the tile just appended ...
-                matches[-1]["pos"] = matches[-1]["pos"].copy()
+                matches[-1]["pos"] = list(matches[-1]["pos"])
                 matches[-1]["pos"][0] *= self.tile_size
                 matches[-1]["pos"][1] *= self.tile_size
                 if not keep:
-                    del self.tilemap[loc]
+                    self.remove_tile(loc)
+
+            results.append(matches)
+
+        # Drop all the removed offgrid tiles at once, and index the rest again
+        if removed_offgrid:
+            self.offgrid_tiles = [
+                tile for tile in self.offgrid_tiles if id(tile) not in removed_offgrid
+            ]
+            self.index_offgrid()
+
+        return results
 
-        return matches
+    def index_types(self):
+        """Build the (type, variant) index from scratch"""
+        self.ongrid_by_type = {}
+        self.offgrid_by_type = {}
+        self.type_order = 0
+        for tile in self.offgrid_tiles:
+            self.index_type_offgrid(tile)
+        for loc, tile in self.tilemap.items():
+            self.index_type(loc, tile)
+
+    def index_type(self, loc, tile):
+        if self.ongrid_by_type is None:
+            return
+        self.ongrid_by_type.setdefault((tile["type"], tile["variant"]), {})[
+            loc
+        ] = self.type_order
+        self.type_order += 1
+
+    def unindex_type(self, loc, tile):
+        if self.ongrid_by_type is None:
+            return
+        self.ongrid_by_type.get((tile["type"], tile["variant"]), {}).pop(loc, None)
+
+    def index_type_offgrid(self, tile):
+        if self.offgrid_by_type is None:
+            return
+        self.offgrid_by_type.setdefault((tile["type"], tile["variant"]), {})[
+            id(tile)
+        ] = (self.type_order, tile)
+        self.type_order += 1
+
+    def unindex_type_offgrid(self, tile):
+        if self.offgrid_by_type is None:
+            return
+        self.offgrid_by_type.get((tile["type"], tile["variant"]), {}).pop(
+            id(tile), None
+        )
+
+    def add_tile(self, loc, tile):
+        """Place a tile at loc (x, y), replacing the existing one,
+        and keep the moving tile registry up to date"""
+        self.remove_tile(loc)
+        self.tilemap[loc] = tile
+        if tile["type"] in PHYSICS_TILES:
+            self.solid_version += 1
+        self.index_type(loc, tile)
+        self.collision_rects[loc] = self.make_collision_rect(loc, tile)
+        if self.occupancy is not None:
+            self.occupancy.set(loc, tile, self.tilemap)
+        if tile["type"] == "movingtile":
+            self.register_movingtile(loc, tile)
+        else:
+            self.chunks.invalidate(loc, tile)
+
+    def remove_tile(self, loc):
+        """Remove the tile at loc (x, y). Return the removed tile or None"""
+        tile = self.tilemap.pop(loc, None)
+        self.collision_rects.pop(loc, None)
+        if tile:
+            # Only the solid tiles change the runs walkers patrol (e.g. not food)
+            if tile["type"] in PHYSICS_TILES:
+                self.solid_version += 1
+            self.unindex_type(loc, tile)
+            if self.occupancy is not None:
+                self.occupancy.set(loc, None, self.tilemap)
+        if loc in self.movingtiles:
+            self.unregister_movingtile(loc)
+        elif tile:
+            self.chunks.invalidate(loc, tile)
+        return tile
+
+    def add_offgrid(self, tile):
+        """Append an offgrid tile and add it to the offgrid index"""
+        self.offgrid_tiles.append(tile)
+        self.index_offgrid_tile(len(self.offgrid_tiles) - 1)
+        self.index_type_offgrid(tile)
+
+    def remove_offgrid(self, tile):
+        """Remove an offgrid tile. Indices shift, so the index is rebuilt.
+        It does not happen during the game, only in the editor."""
+        self.offgrid_tiles.remove(tile)
+        self.unindex_type_offgrid(tile)
+        self.index_offgrid()
+
+    def index_offgrid(self):
+        """Build the offgrid index from scratch"""
+        self.offgrid_rects = []
+        self.offgrid_buckets = {}
+        for i in range(len(self.offgrid_tiles)):
+            self.index_offgrid_tile(i)
+
+    def index_offgrid_tile(self, i):
+        tile = self.offgrid_tiles[i]
+        # Some tiles (ex. spawners) do not have images in the game.
+        # They are extracted right after loading, so a tile sized rect is fine.
+        images = self.game.assets.get(tile["type"])
+        size = (
+            images[tile["variant"]].get_size()
+            if images
+            else (self.tile_size, self.tile_size)
+        )
+        # Offgrid positions are not integers. Add one pixel to cover the fraction.
+        rect = pygame.Rect(tile["pos"][0], tile["pos"][1], size[0] + 1, size[1] + 1)
+        self.offgrid_rects.append(rect)
+        for bucket in range(
+            rect.left // OFFGRID_BUCKET_WIDTH,
+            (rect.right - 1) // OFFGRID_BUCKET_WIDTH + 1,
+        ):
+            self.offgrid_buckets.setdefault(bucket, []).append(i)
+
+    def offgrid_indices_in(self, rect):
+        """Return the indices of offgrid tiles overlapping rect, in the order of offgrid_tiles"""
+        indices = set()
+        for bucket in range(
+            rect.left // OFFGRID_BUCKET_WIDTH,
+            (rect.right - 1) // OFFGRID_BUCKET_WIDTH + 1,
+        ):
+            for i in self.offgrid_buckets.get(bucket, ()):
+                if self.offgrid_rects[i].colliderect(rect):
+                    indices.add(i)
+        return sorted(indices)
+
+    def offgrid_tiles_at(self, pos):
+        """Return the offgrid tiles whose image contains pos"""
+        tiles = []
+        for i in self.offgrid_indices_in(pygame.Rect(pos[0], pos[1], 1, 1)):
+            tile = self.offgrid_tiles[i]
+            images = self.game.assets.get(tile["type"])
+            size = (
+                images[tile["variant"]].get_size()
+                if images
+                else (self.tile_size, self.tile_size)
+            )
+            if (
+                tile["pos"][0] <= pos[0] < tile["pos"][0] + size[0]
+                and tile["pos"][1] <= pos[1] < tile["pos"][1] + size[1]
+            ):
+                tiles.append(tile)
+        return tiles
+
+    def register_movingtile(self, loc, tile):
+        """Add the moving tile to the buckets of every column it can travel to"""
+        max_range = MOVINGTILE_SPECS[(tile["type"], tile["variant"])]["max_range"]
+        travel_rect = pygame.Rect(
+            loc[0] * self.tile_size - max_range[0],
+            loc[1] * self.tile_size - max_range[1],
+            self.tile_size + 2 * max_range[0],
+            self.tile_size + 2 * max_range[1],
+        )
+        self.movingtiles[loc] = travel_rect
+        self.movingtile_locs = None
+        for bucket in range(
+            travel_rect.left // MOVINGTILE_BUCKET_WIDTH,
+            (travel_rect.right - 1) // MOVINGTILE_BUCKET_WIDTH + 1,
+        ):
+            self.movingtile_buckets.setdefault(bucket, {})[loc] = travel_rect
+
+    def unregister_movingtile(self, loc):
+        travel_rect = self.movingtiles.pop(loc)
+        self.movingtile_locs = None
+        for bucket in range(
+            travel_rect.left // MOVINGTILE_BUCKET_WIDTH,
+            (travel_rect.right - 1) // MOVINGTILE_BUCKET_WIDTH + 1,
+        ):
+            del self.movingtile_buckets[bucket][loc]
+            if not self.movingtile_buckets[bucket]:
+                del self.movingtile_buckets[bucket]
 
     def tiles_around(self, entity_pos, is_tall):
         """Collect tiles around entity"""
-        tiles = []
+        return [self.tilemap[loc] for loc in self.locs_around(entity_pos, is_tall)]
+
+    def locs_around(self, entity_pos, is_tall):
+        """Collect the locations (x, y) of the tiles around entity"""
+        locs = []
 
         # First, collect the tiles around, using the entity_loc.
         # These tiles will be used for collide check.
@@ -101,24 +393,37 @@ class Tilemap:
             int(entity_pos[1] // self.tile_size),
         )
         for offset in NEIGHBOR_OFFSETS_TALL if is_tall else NEIGHBOR_OFFSETS:
-            check_loc = f"{entity_loc[0] + offset[0]};{entity_loc[1] + offset[1]}"
-            if check_loc in self.tilemap:
-                if not self.tilemap[check_loc]["type"] == "movingtile":
-                    tiles.append(self.tilemap[check_loc])
+            loc = (entity_loc[0] + offset[0], entity_loc[1] + offset[1])
+            tile = self.tilemap.get(loc)
+            if tile and not tile["type"] == "movingtile":
+                locs.append(loc)
 
         # Tile with type "movingtile" is special one. It's moving thus, check_loc based
         # searching does not work.
-        # Use actual pixel position to check if it's around player.
+        # First, pick the moving tiles which can reach the area around the entity
+        # from the buckets, then use actual pixel position to check if it's around player.
+        search_rect = pygame.Rect(
+            entity_pos[0] - self.tile_size - 1,
+            entity_pos[1] - self.tile_size - 1,
+            2 * self.tile_size + 2,
+            (4 if is_tall else 3) * self.tile_size + 2,
+        )
+        if self.movingtile_locs is None:
+            self.pack_movingtiles()
         tiles_to_check = {}
-        for tile in self.tilemap:
-            if self.tilemap[tile]["type"] == "movingtile":
-                tiles_to_check[tile] = self.tilemap[tile]
-
-        for tile in tiles_to_check:
-            # If "renderpos" not exist in this tile, set (0,0).
-            # This is okay because the tile will be positioned at (0,0)
-            # for only the very first one frame.
-            tile_pos = tiles_to_check[tile].get("renderpos", (0, 0))
+        for bucket in range(
+            search_rect.left // MOVINGTILE_BUCKET_WIDTH,
+            search_rect.right // MOVINGTILE_BUCKET_WIDTH + 1,
+        ):
+            for loc, travel_rect in self.movingtile_buckets.get(bucket, {}).items():
+                if loc not in tiles_to_check and travel_rect.colliderect(search_rect):
+                    tiles_to_check[loc] = self.movingtile_slots[loc]
+
+        for loc, slot in tiles_to_check.items():
+            tile_pos = (
+                self.movingtile_pos[2 * slot],
+                self.movingtile_pos[2 * slot + 1],
+            )
             for offset in NEIGHBOR_OFFSETS_TALL if is_tall else NEIGHBOR_OFFSETS:
                 check_pos = (
                     entity_pos[0] + offset[0] * self.tile_size,
@@ -130,22 +435,20 @@ class Tilemap:
                     and check_pos[1] > tile_pos[1]
                     and check_pos[1] < tile_pos[1] + self.tile_size
                 ):
-                    tiles.append(tiles_to_check[tile])
+                    locs.append(loc)
 
-        return tiles
+        return locs
 
     def save(self, path):
-        f = open(path, "w")
-        for tile in self.tilemap:
-            tile_to_save = self.tilemap[tile].copy()
-            tile_to_save.pop("renderpos", None)
-            tile_to_save.pop("renderpos_prev", None)
-            tile_to_save.pop("transport", None)
-            self.tilemap.update({tile: tile_to_save})
+        # Map files keep the "x;y" string keys. Convert the (x, y) keys back here.
+        tilemap_to_save = {}
+        for loc in self.tilemap:
+            tilemap_to_save[f"{loc[0]};{loc[1]}"] = self.tilemap[loc]
 
+        f = open(path, "w")
         json.dump(
             {
-                "tilemap": self.tilemap,
+                "tilemap": tilemap_to_save,
                 "tile_size": self.tile_size,
                 "offgrid": self.offgrid_tiles,
             },
@@ -153,27 +456,166 @@ class Tilemap:
         )
         f.close()
 
+        # If the map has been packed into the binary level file, pack it again.
+        # Otherwise the stale binary file will be ignored and the json is parsed at load.
+        if os.path.exists(packed_path(path)):
+            pack_map(path)
+
     def load(self, path):
-        f = open(path, "r")
-        map_data = json.load(f)
+        # Use the binary level file if it is available, else parse the json
+        map_data = read_map(path)
         self.tilemap = map_data["tilemap"]
         self.tile_size = map_data["tile_size"]
+        self.solid_version += 1
         self.offgrid_tiles = map_data["offgrid"]
+        self.index_offgrid()
+
+        # Rebuild the moving tile registry for the new map
+        self.movingtiles = {}
+        self.movingtile_buckets = {}
+        for loc, tile in self.tilemap.items():
+            if tile["type"] == "movingtile":
+                self.register_movingtile(loc, tile)
+        self.index_types()
+        self.build_occupancy()
+        self.collision_rects = {
+            loc: self.make_collision_rect(loc, tile)
+            for loc, tile in self.tilemap.items()
+        }
+        self.shared_collision_rects = {}
+        self.pack_movingtiles()
+        self.movingtile_tick = 0
+        self.chunks.invalidate_all()
+
+    def snapshot(self):
+        """Freeze the current state of the map, to be shared by restore() later.
+        Tiles are frozen too, as all the attempts restored from this will share them."""
+        return MappingProxyType(
+            {
+                "tilemap": MappingProxyType(
+                    {
+                        loc: MappingProxyType(tile.copy())
+                        for loc, tile in self.tilemap.items()
+                    }
+                ),
+                "tile_size": self.tile_size,
+                "offgrid_tiles": tuple(
+                    MappingProxyType(tile.copy()) for tile in self.offgrid_tiles
+                ),
+                "offgrid_rects": tuple(self.offgrid_rects),
+                "offgrid_buckets": MappingProxyType(
+                    {
+                        bucket: tuple(indices)
+                        for bucket, indices in self.offgrid_buckets.items()
+                    }
+                ),
+                "movingtiles": MappingProxyType(self.movingtiles.copy()),
+                "movingtile_buckets": MappingProxyType(
+                    {
+                        bucket: MappingProxyType(tiles.copy())
+                        for bucket, tiles in self.movingtile_buckets.items()
+                    }
+                ),
+                "occupancy": self.occupancy.freeze() if self.occupancy else None,
+                "collision_rects": MappingProxyType(
+                    {
+                        loc: collision_rect
+                        for rects in (self.shared_collision_rects, self.collision_rects)
+                        for loc, collision_rect in rects.items()
+                        if loc in self.tilemap and loc not in self.movingtiles
+                    }
+                ),
+                "overflow": self.chunks.overflow,
+                # Not frozen. Chunks baked by any attempt are collected here.
+                "chunks": {},
+            }
+        )
+
+    def restore(self, snapshot):
+        """Start a new attempt from a snapshot. It is a copy-on-write view.
+        The frozen tiles and baked chunks are shared, and only the containers are copied,
+        so removing tiles (ex. eating a reward) affects this attempt only.
+        Collision rects of moving tiles are made for each attempt, as they are moved."""
+        self.tilemap = dict(snapshot["tilemap"])
+        self.tile_size = snapshot["tile_size"]
+        self.solid_version += 1
+        self.offgrid_tiles = list(snapshot["offgrid_tiles"])
+        self.offgrid_rects = list(snapshot["offgrid_rects"])
+        self.offgrid_buckets = {
+            bucket: list(indices)
+            for bucket, indices in snapshot["offgrid_buckets"].items()
+        }
+        self.movingtiles = dict(snapshot["movingtiles"])
+        self.shared_collision_rects = snapshot["collision_rects"]
+        self.collision_rects = {
+            loc: self.make_collision_rect(loc, self.tilemap[loc])
+            for loc in self.movingtiles
+        }
+        self.movingtile_buckets = {
+            bucket: dict(tiles)
+            for bucket, tiles in snapshot["movingtile_buckets"].items()
+        }
+        self.pack_movingtiles()
+        # Moving tiles start over from their home positions in every attempt
+        self.movingtile_tick = 0
+        self.chunks.share(snapshot["chunks"], snapshot["overflow"])
+        if snapshot["occupancy"]:
+            self.occupancy = snapshot["occupancy"].copy()
+        else:
+            self.occupancy = None
+        # Attempts rarely extract tiles. Index them only when it's needed.
+        self.ongrid_by_type = None
+        self.offgrid_by_type = None
 
     def solid_check(self, pos):
         """Check if pos is for solid tiles"""
-        tile_loc = f"{int(pos[0] // self.tile_size)};{int(pos[1] // self.tile_size)}"
-        if tile_loc in self.tilemap:
-            if self.tilemap[tile_loc]["type"] in PHYSICS_TILES:
-                return self.tilemap[tile_loc]
+        tile = self.tilemap.get(
+            (int(pos[0] // self.tile_size), int(pos[1] // self.tile_size))
+        )
+        if tile and tile["type"] in PHYSICS_TILES:
+            return tile
+
+    def solid_run(self, pos):
+        """Return (x_min, x_max, y_min, y_max) in pixels of the run of solid tiles
+        in the row of pos, which pos is on. Any position (x, y) with x_min <= x < x_max
+        and y_min <= y < y_max is on a solid tile, as solid_check tells.
+        None if pos is not on a solid tile."""
+        if not self.solid_check(pos):
+            return None
+        x = int(pos[0] // self.tile_size)
+        y = int(pos[1] // self.tile_size)
+        left = x
+        while self.solid_check(((left - 1) * self.tile_size, y * self.tile_size)):
+            left -= 1
+        right = x
+        while self.solid_check(((right + 1) * self.tile_size, y * self.tile_size)):
+            right += 1
+        return (
+            left * self.tile_size,
+            (right + 1) * self.tile_size,
+            y * self.tile_size,
+            (y + 1) * self.tile_size,
+        )
+
+    def build_occupancy(self):
+        if np is not None:
+            self.occupancy = OccupancyGrid(self.tile_size, PHYSICS_TILES)
+            self.occupancy.build(self.tilemap)
+
+    def solid_points(self, points):
+        """Check many positions at once. Return a list of booleans telling
+        if each position is on a solid tile, as solid_check does for one position."""
+        if self.occupancy is not None and len(points) >= MIN_BATCH_POINTS:
+            return self.occupancy.points(points).tolist()
+        return [bool(self.solid_check(pos)) for pos in points]
 
     def rects_around(self, entity, tile_types=["physics"]):
-        """Return a list of rects around entity
+        """Return a list of CollisionRect around entity
         Important: If the tile_type is movingground (tile type = "movingtile"),
-        we need to return the rects for the previous position of each tile too, thus
-        the returning a list of dict [{"rect":rect for current pos, "rect_prev": rect for previous pos}, ...]
-        Other than the movingground, the returning list will have only one component,
-        [{"rect":rect for current pos}, ...]
+        we need the rect for the previous position of each tile too (rect_prev),
+        and how much it moved in x axis (dx). Other than the movingground,
+        rect_prev is the same as rect, and dx is 0.
+        The CollisionRects are cached and reused, instead of making new ones every call.
         """
         # Get position of physics tiles around the entity
         pos = entity.pos
@@ -196,39 +638,26 @@ class Tilemap:
             else:
                 return []
 
-            tiles_to_check = self.tiles_around(pos, is_tall)
-            for tile in tiles_to_check:
-                if tile["type"] in tile_types_to_check:
-                    if tile["type"] == "movingtile":
-                        rect_to_add = {
-                            "rect": pygame.Rect(
-                                tile.get("renderpos", [0, 0])[0],
-                                tile.get("renderpos", [0, 0])[1],
-                                self.tile_size,
-                                self.tile_size,
-                            ),
-                            "rect_prev": pygame.Rect(
-                                tile.get("renderpos_prev", [0, 0])[0],
-                                tile.get("renderpos_prev", [0, 0])[1],
-                                self.tile_size,
-                                self.tile_size,
-                            ),
-                            "dx": tile.get("renderpos", [0, 0])[0]
-                            - tile.get("renderpos_prev", [0, 0])[0],
-                        }
+            for loc in self.locs_around(pos, is_tall):
+                if self.tilemap[loc]["type"] in tile_types_to_check:
+                    if loc in self.collision_rects:
+                        rects.append(self.collision_rects[loc])
                     else:
-                        rect_to_add = {
-                            "rect": pygame.Rect(
-                                tile["pos"][0] * self.tile_size,
-                                tile["pos"][1] * self.tile_size,
-                                self.tile_size,
-                                self.tile_size,
-                            )
-                        }
-
-                    rects.append(rect_to_add)
+                        rects.append(self.shared_collision_rects[loc])
         return rects
 
+    def make_collision_rect(self, loc, tile):
+        rect = pygame.Rect(
+            loc[0] * self.tile_size,
+            loc[1] * self.tile_size,
+            self.tile_size,
+            self.tile_size,
+        )
+        if tile["type"] == "movingtile":
+            # Moving tiles start at their own cell
+            return CollisionRect(rect, rect.copy())
+        return CollisionRect(rect)
+
     def reward_tiles_around(self, entity):
         # Get id_pairs of reward tiles around
         pos = entity.pos
@@ -252,129 +681,130 @@ class Tilemap:
             tile = self.tilemap[loc]
             neighbors = set()
             for shift in [(1, 0), (-1, 0), (0, -1), (0, 1)]:
-                check_loc = f"{tile['pos'][0] + shift[0]};{tile['pos'][1] + shift[1]}"
+                check_loc = (tile["pos"][0] + shift[0], tile["pos"][1] + shift[1])
                 if check_loc in self.tilemap:
                     if self.tilemap[check_loc]["type"] == tile["type"]:
                         neighbors.add(shift)
             neighbors = tuple(sorted(neighbors))
             if tile["type"] in AUTOTILE_TYPES and neighbors in AUTOTILE_MAP:
                 tile["variant"] = AUTOTILE_MAP[neighbors]
+        # Variants may have been changed anywhere. Index and bake the chunks again.
+        if self.ongrid_by_type is not None:
+            self.index_types()
+        self.chunks.invalidate_all()
 
-    def update_global_transport(self):
-        for movingtile_spec in MOVINGTILE_SPECS:
-            # Get old one
-            self.transport[movingtile_spec] = self.transport.get(
-                movingtile_spec, (0, 0)
-            )
-            # Update
-            self.transport[movingtile_spec] = (
-                self.transport[movingtile_spec][0]
-                + MOVINGTILE_SPECS[movingtile_spec]["initial_speed"][0],
-                self.transport[movingtile_spec][1]
-                + MOVINGTILE_SPECS[movingtile_spec]["initial_speed"][1],
+    def pack_movingtiles(self):
+        """Give each moving tile a slot in the arrays, at its own cell"""
+        self.movingtile_locs = list(self.movingtiles)
+        self.movingtile_slots = {}
+        self.movingtile_groups = array.array("H")
+        self.movingtile_home = array.array("d")
+        self.movingtile_rects = []
+        for slot, loc in enumerate(self.movingtile_locs):
+            tile = self.tilemap[loc]
+            self.movingtile_slots[loc] = slot
+            self.movingtile_groups.append(
+                MOVINGTILE_GROUPS[(tile["type"], tile["variant"])]
             )
-            # If it went too much, switch sign to make it bound in -2 ~ +2
-            if abs(self.transport[movingtile_spec][0]) > 2:
-                self.transport[movingtile_spec] = (
-                    self.transport[movingtile_spec][0] * -1,
-                    self.transport[movingtile_spec][1],
-                )
-            if abs(self.transport[movingtile_spec][1]) > 2:
-                self.transport[movingtile_spec] = (
-                    self.transport[movingtile_spec][0],
-                    self.transport[movingtile_spec][1] * -1,
-                )
+            self.movingtile_home.append(loc[0] * self.tile_size)
+            self.movingtile_home.append(loc[1] * self.tile_size)
+            self.movingtile_rects.append(self.collision_rects[loc])
+        self.movingtile_pos = array.array("d", self.movingtile_home)
+        self.movingtile_pos_prev = array.array("d", self.movingtile_home)
+
+    def update(self, activate_movingground=True):
+        """Move the moving tiles by one tick, whether they are in the camera or not.
+        Each group's offset is taken from its precomputed table only once,
+        and the arrays and collision rects are updated in place."""
+        if self.movingtile_locs is None:
+            self.pack_movingtiles()
+        self.movingtile_tick += 1
+
+        offsets = self.movingtile_offsets
+        for group, table in enumerate(MOVINGTILE_OFFSETS):
+            if activate_movingground:
+                i = self.movingtile_tick % (len(table) // 2)
+                offsets[2 * group] = table[2 * i]
+                offsets[2 * group + 1] = table[2 * i + 1]
+            else:
+                offsets[2 * group] = 0
+                offsets[2 * group + 1] = 0
+
+        # Positions of the last tick become the previous ones
+        self.movingtile_pos, self.movingtile_pos_prev = (
+            self.movingtile_pos_prev,
+            self.movingtile_pos,
+        )
+        pos = self.movingtile_pos
+        pos_prev = self.movingtile_pos_prev
+        home = self.movingtile_home
+        for slot, (group, collision_rect) in enumerate(
+            zip(self.movingtile_groups, self.movingtile_rects)
+        ):
+            i = 2 * slot
+            x = home[i] + offsets[2 * group]
+            y = home[i + 1] + offsets[2 * group + 1]
+            pos[i] = x
+            pos[i + 1] = y
+            # Truncate as pygame.Rect(x, y, ...) does
+            collision_rect.rect_prev.topleft = collision_rect.rect.topleft
+            collision_rect.rect.x = int(x)
+            collision_rect.rect.y = int(y)
+            collision_rect.dx = x - pos_prev[i]
 
     def render(
         self,
         surf,
         offset=(0, 0),
-        activate_movingground=True,
         show_movingground_id_pair=False,
     ):
         # Handle some decorative tiles first ...
-        for tile in self.offgrid_tiles:
-            (x, y) = (
-                tile["pos"][0] - offset[0],
-                tile["pos"][1] - offset[1],
-            )
-            surf.blit(
-                self.game.assets[tile["type"]][tile["variant"]],
-                (x, y),
+        # Only the tiles overlapping the camera are taken from the offgrid index.
+        camera_rect = pygame.Rect(
+            offset[0], offset[1], surf.get_width(), surf.get_height()
+        )
+        assets = self.game.assets
+        blit_sequence = []
+        for i in self.offgrid_indices_in(camera_rect):
+            tile = self.offgrid_tiles[i]
+            blit_sequence.append(
+                (
+                    assets[tile["type"]][tile["variant"]],
+                    (tile["pos"][0] - offset[0], tile["pos"][1] - offset[1]),
+                )
             )
+        blit_all(surf, blit_sequence)
 
-        # Calculate global transport for moving tiles
-        self.update_global_transport()
+        # Render static ongrid tiles now, using the baked chunks.
+        # Only the chunks inside the camera are rendered (and baked if needed).
+        self.chunks.render(surf, offset=offset)
 
-        # Render ongrid tiles now.
-        # If tile in the world is outside the camera, avoid render them for faster operation.
-        # Range all the numbers between tile cordinate of top left - 1 and bottom right + 1
-        for x in range(
-            offset[0] // self.tile_size - 1,
-            (offset[0] + surf.get_width()) // self.tile_size + 1,
-        ):
-            for y in range(
-                offset[1] // self.tile_size - 1,
-                (offset[1] + surf.get_height()) // self.tile_size + 1,
-            ):
-                loc = f"{x};{y}"
-                if loc in self.tilemap:
-                    tile = self.tilemap[loc]
-                    renderpos = (
-                        tile["pos"][0] * self.tile_size,
-                        tile["pos"][1] * self.tile_size,
-                    )
-                    if tile["type"] == "movingtile" and activate_movingground:
-                        renderpos_moved = (
-                            renderpos[0]
-                            + math.sin(
-                                self.transport[(tile["type"], tile["variant"])][0]
-                                * math.pi
-                            )
-                            * MOVINGTILE_SPECS[(tile["type"], tile["variant"])][
-                                "max_range"
-                            ][0],
-                            renderpos[1]
-                            + math.cos(
-                                self.transport[(tile["type"], tile["variant"])][1]
-                                * math.pi
-                            )
-                            * MOVINGTILE_SPECS[(tile["type"], tile["variant"])][
-                                "max_range"
-                            ][1],
-                        )
-                        # Update tilemap with movingtile position
-                        self.tilemap[loc] = {
-                            "type": tile["type"],
-                            "variant": tile["variant"],
-                            "pos": tile["pos"],
-                            "transport": self.transport[
-                                (tile["type"], tile["variant"])
-                            ],
-                            "renderpos_prev": self.tilemap[loc].get(
-                                "renderpos", renderpos
-                            ),
-                        }
-                        self.tilemap[loc]["renderpos"] = renderpos_moved
-                    else:
-                        self.tilemap[loc]["renderpos"] = renderpos
-                    surf.blit(
-                        self.game.assets[tile["type"]][tile["variant"]],
-                        (
-                            self.tilemap[loc]["renderpos"][0] - offset[0],
-                            self.tilemap[loc]["renderpos"][1] - offset[1],
-                        ),
+        # Render moving tiles on top of the chunks, where update() moved them.
+        # If tile cannot reach the inside of the camera, avoid render them for faster operation.
+        if self.movingtile_locs is None:
+            self.pack_movingtiles()
+        pos = self.movingtile_pos
+        blit_sequence = []
+        for slot, loc in enumerate(self.movingtile_locs):
+            if not self.movingtiles[loc].colliderect(camera_rect):
+                continue
+            tile = self.tilemap[loc]
+            blit_sequence.append(
+                (
+                    assets[tile["type"]][tile["variant"]],
+                    (pos[2 * slot] - offset[0], pos[2 * slot + 1] - offset[1]),
+                )
+            )
+            # Display id_pair of movingtile if requested.
+            # show_movingground_id_pair is True only when called from map editor.
+            if show_movingground_id_pair:
+                id_pair_img = self.game.text_font.render(
+                    str(tile["variant"]), False, (255, 255, 255)
+                )
+                blit_sequence.append(
+                    (
+                        id_pair_img,
+                        (pos[2 * slot] - offset[0], pos[2 * slot + 1] + 17 - offset[1]),
                     )
-                    # Display id_pair of movingtile if requested.
-                    # show_movingground_id_pair is True only when called from map editor.
-                    if tile["type"] == "movingtile" and show_movingground_id_pair:
-                        id_pair_img = self.game.text_font.render(
-                            str(tile["variant"]), False, (255, 255, 255)
-                        )
-                        surf.blit(
-                            id_pair_img,
-                            (
-                                self.tilemap[loc]["renderpos"][0] - offset[0],
-                                self.tilemap[loc]["renderpos"][1] + 17 - offset[1],
-                            ),
-                        )
+                )
+        blit_all(surf, blit_sequence)
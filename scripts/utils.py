@@ -115,6 +115,15 @@ def draw_text(
     return (x, y)
 
 
+def blit_all(surf, blit_sequence):
+    """Blit (image, pos) pairs in one call"""
+    if hasattr(surf, "fblits"):
+        # pygame-ce
+        surf.fblits(blit_sequence)
+    else:
+        surf.blits(blit_sequence, doreturn=False)
+
+
 def load_score_highest(path):
     """Load a single line from the file (path)
     Possibly the file does not exist. Set as zero in the case."""